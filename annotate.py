@@ -0,0 +1,178 @@
+'''
+Annotates recorded games with an engine, streaming them from a file one line at a time.
+
+Each line holds a game, as an optional FEN followed by a semicolon and then its moves,
+written as e2e4 or e2 to e4 and separated by spaces or commas. Every position of each
+game is searched by a pool of worker processes, with a depth and an optional time limit
+per position, and a line of JSON is written for each move, in order, with the engine's
+score in centipawns for the player to move, its best move, and whether the move played
+was a blunder.
+
+Only a window of positions is in flight at once, so memory stays bounded however long
+the input is. Throughput is reported on stderr.
+
+$ python annotate.py games.txt [--output annotated.jsonl] [--depth 3] [--time-limit 1]
+      [--cache analysis.sqlite] [--processes 4] [--window 64] [--blunder 200] [--telemetry events.jsonl]
+'''
+import argparse
+import json
+import re
+import sys
+from collections import deque
+from multiprocessing import Pool, cpu_count
+from time import perf_counter
+
+import fen
+from cache import AnalysisCache
+from search import analyse, is_legal
+from structure import PawnTable
+from telemetry import Telemetry
+from transposition import TranspositionTable
+
+MOVE = re.compile(r'([a-z])(\d+)\s*(?:to\s*)?([a-z])(\d+)')
+REPORT_EVERY = 1000  # Positions between progress reports
+
+worker = {}
+
+
+def parse_game(line):
+    '''
+    Returns the starting FEN and the list of moves of a game line.
+    '''
+    position, _, moves = line.rpartition(';')
+    moves = [((fen.FILES.index(start_x), int(start_y) - 1), (fen.FILES.index(target_x), int(target_y) - 1))
+             for start_x, start_y, target_x, target_y in MOVE.findall(moves.lower())]
+    return position.strip() or fen.START, moves
+
+
+def replay(line):
+    '''
+    Plays out a game line, yielding the FEN of each position along with the move played
+    from it, which is None for the final position. Raises ValueError on an invalid FEN
+    or an illegal move.
+    '''
+    position, moves = parse_game(line)
+    try:
+        board, white, black, player = fen.load(position)
+    except (IndexError, KeyError):
+        raise ValueError('invalid FEN {}'.format(position))
+    for move in moves:
+        if not is_legal(player, move):
+            raise ValueError('illegal move {} in {}'.format(fen.coordinates(move), fen.dump(board, player)))
+        yield fen.dump(board, player), move
+        board.get(*move[0]).move(*move[1])
+        player = player.opponents[0]
+    yield fen.dump(board, player), None
+
+
+def start_worker(depth, time_limit, table_size_mb, cache_path, telemetry_target=None):
+    worker['depth'] = depth
+    worker['time_limit'] = time_limit
+    worker['table'] = TranspositionTable(table_size_mb)
+    worker['pawn_table'] = PawnTable()
+    worker['cache'] = AnalysisCache(cache_path) if cache_path else None
+    worker['telemetry'] = Telemetry(telemetry_target) if telemetry_target else None
+
+
+def analyse_position(position):
+    board, white, black, player = fen.load(position)
+    score, move, nodes = analyse(player, worker['depth'], worker['table'], worker['cache'], worker['time_limit'],
+                                 worker['telemetry'], worker['pawn_table'])
+    if worker['cache'] is not None:
+        worker['cache'].flush()
+    return score, move, nodes
+
+
+def positions(lines):
+    '''
+    Yields (game, ply, fen, move) for every position of every game, or (game, None, error,
+    None) for a game that can't be replayed.
+    '''
+    for game, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            game_positions = list(replay(line))  # Check the whole game before analysing any of it
+        except ValueError as error:
+            yield game, None, str(error), None
+            continue
+        for ply, (position, move) in enumerate(game_positions):
+            yield game, ply, position, move
+
+
+def annotations(lines, pool, window=64, blunder=200):
+    '''
+    Yields an annotation dict for each move of each game in lines, in order, keeping at
+    most window positions waiting on the pool.
+    '''
+    pending = deque()
+    previous = None
+
+    def annotate(item, result):
+        nonlocal previous
+        game, ply, position, move = item
+        if ply is None:
+            return {'game': game, 'error': position}
+        score, best_move, nodes = result
+        annotation = None
+        if ply:
+            # The score before the move against the score after it, for the player who made it.
+            previous['loss'] = previous['eval'] + score
+            previous['blunder'] = previous['loss'] >= blunder
+            annotation = previous
+        previous = {'game': game, 'ply': ply, 'fen': position, 'move': fen.coordinates(move),
+                    'best': fen.coordinates(best_move), 'eval': score, 'nodes': nodes}
+        return annotation
+
+    for item in positions(lines):
+        result = None if item[1] is None else pool.apply_async(analyse_position, (item[2],))
+        pending.append((item, result))
+        while pending and (len(pending) >= window or pending[0][1] is None or pending[0][1].ready()):
+            item, result = pending.popleft()
+            annotation = annotate(item, result.get() if result else None)
+            if annotation:
+                yield annotation
+
+    while pending:
+        item, result = pending.popleft()
+        annotation = annotate(item, result.get() if result else None)
+        if annotation:
+            yield annotation
+
+
+def annotate_file(lines, output, depth=3, time_limit=None, cache_path=None, processes=None, window=64,
+                  blunder=200, table_size_mb=16, telemetry_target=None, log=sys.stderr):
+    '''
+    Writes annotations for the games in lines to output as JSON lines, returning the
+    number of positions analysed and the seconds taken.
+    '''
+    start = perf_counter()
+    count = 0
+    initargs = (depth, time_limit, table_size_mb, cache_path, telemetry_target)
+    with Pool(processes or cpu_count(), start_worker, initargs) as pool:
+        for annotation in annotations(lines, pool, window, blunder):
+            output.write(json.dumps(annotation) + '\n')
+            if 'move' in annotation:
+                count += 1
+                if log and not count % REPORT_EVERY:
+                    log.write('{} positions, {:.1f} per second\n'.format(count, count / (perf_counter() - start)))
+    return count, perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Annotate recorded games with an engine.')
+    parser.add_argument('games', type=argparse.FileType('r'), help='game file, or - for stdin')
+    parser.add_argument('--output', type=argparse.FileType('w'), default=sys.stdout)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--time-limit', type=float, help='seconds to search each position')
+    parser.add_argument('--cache', help='SQLite analysis cache to share between runs')
+    parser.add_argument('--processes', type=int)
+    parser.add_argument('--window', type=int, default=64, help='positions in flight at once')
+    parser.add_argument('--blunder', type=int, default=200, help='centipawns lost to flag a move as a blunder')
+    parser.add_argument('--telemetry', help='file, or unix:/path of a socket, to stream search events to')
+    args = parser.parse_args()
+
+    count, seconds = annotate_file(args.games, args.output, args.depth, args.time_limit, args.cache,
+                                   args.processes, args.window, args.blunder, telemetry_target=args.telemetry)
+    sys.stderr.write('Annotated {} positions in {:.1f}s, {:.1f} per second.\n'.format(
+        count, seconds, count / seconds if seconds else 0.0))
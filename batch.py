@@ -0,0 +1,285 @@
+'''
+Vectorised legal move generation over many positions at once.
+
+Positions are (N, 8, 8) int8 arrays indexed [n, x, y] like the Chessboard, holding
+a piece code from PIECE_CODES, positive for the White player (direction 1) and
+negative for the Black player (direction -1). A matching (N, 8, 8) bool array marks
+unmoved pieces: Pawns that may move two spaces, and Kings and Rooks that may castle.
+'''
+import numpy as np
+
+from chess import Chessboard, Player
+from codes import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_CODES
+from pieces import Pawn, Knight, Bishop, Rook, Queen, King, CARDINAL_DIRECTIONS, DIAGONAL_DIRECTIONS, ALL_DIRECTIONS
+
+PIECE_CLASSES = {PAWN: Pawn, KNIGHT: Knight, BISHOP: Bishop, ROOK: Rook, QUEEN: Queen, KING: King}
+KNIGHT_MOVES = Knight.moves
+SIZE = 8
+
+
+def _shift(squares, dx, dy):
+    '''
+    Moves every square of an (N, 8, 8) array by (dx, dy), dropping squares pushed off the board.
+    '''
+    shifted = np.zeros_like(squares)
+    shifted[:, max(dx, 0):SIZE + min(dx, 0), max(dy, 0):SIZE + min(dy, 0)] = \
+        squares[:, max(-dx, 0):SIZE + min(-dx, 0), max(-dy, 0):SIZE + min(-dy, 0)]
+    return shifted
+
+
+def _attacks(positions):
+    '''
+    Returns an (N, 8, 8) bool array of the squares threatened by the negative (opponent)
+    pieces of positions, which move towards y = 0.
+    '''
+    enemy = -positions
+    empty = positions == 0
+    attacked = _shift(enemy == PAWN, -1, -1) | _shift(enemy == PAWN, 1, -1)
+
+    for dx, dy in KNIGHT_MOVES:
+        attacked |= _shift(enemy == KNIGHT, dx, dy)
+    for dx, dy in ALL_DIRECTIONS:
+        attacked |= _shift(enemy == KING, dx, dy)
+
+    for directions, slider in [(CARDINAL_DIRECTIONS, ROOK), (DIAGONAL_DIRECTIONS, BISHOP)]:
+        sliders = (enemy == slider) | (enemy == QUEEN)
+        for dx, dy in directions:
+            ray = _shift(sliders, dx, dy)
+            while ray.any():
+                attacked |= ray
+                ray = _shift(ray & empty, dx, dy)
+
+    return attacked
+
+
+def _add_moves(moves, sources, dx, dy, targets):
+    '''
+    Marks moves by (dx, dy) from the squares in sources on to the squares in targets.
+    '''
+    x = np.arange(max(-dx, 0), SIZE - max(dx, 0))
+    y = np.arange(max(-dy, 0), SIZE - max(dy, 0))
+    if not len(x) or not len(y):
+        return
+    x, y = np.meshgrid(x, y, indexing='ij')
+    moves[:, x, y, x + dx, y + dy] |= sources[:, x, y] & targets[:, x + dx, y + dy]
+
+
+def _pseudo_legal_moves(positions, unmoved):
+    '''
+    Returns an (N, 8, 8, 8, 8) bool array of moves for the positive pieces, ignoring
+    the safety of their King.
+    '''
+    moves = np.zeros(positions.shape + positions.shape[1:], dtype=bool)
+    empty = positions == 0
+    not_own = positions <= 0
+
+    pawns = positions == PAWN
+    _add_moves(moves, pawns, 0, 1, empty)
+    _add_moves(moves, pawns & unmoved & _shift(empty, 0, -1), 0, 2, empty)
+    for dx in [-1, 1]:
+        _add_moves(moves, pawns, dx, 1, positions < 0)
+
+    for dx, dy in KNIGHT_MOVES:
+        _add_moves(moves, positions == KNIGHT, dx, dy, not_own)
+    for dx, dy in ALL_DIRECTIONS:
+        _add_moves(moves, positions == KING, dx, dy, not_own)
+
+    for directions, slider in [(CARDINAL_DIRECTIONS, ROOK), (DIAGONAL_DIRECTIONS, BISHOP)]:
+        sliders = (positions == slider) | (positions == QUEEN)
+        for dx, dy in directions:
+            clear = sliders
+            for distance in range(1, SIZE):
+                _add_moves(moves, clear, dx * distance, dy * distance, not_own)
+                clear = clear & _shift(empty, -dx * distance, -dy * distance)
+                if not clear.any():
+                    break
+
+    return moves
+
+
+def _castles(positions, unmoved, attacked, kings):
+    '''
+    Returns an (N, 8, 8, 8, 8) bool array of castle moves for the positive King, using the
+    same rules as King.castles.
+    '''
+    moves = np.zeros(positions.shape + positions.shape[1:], dtype=bool)
+    n, kx, ky = kings
+    can_castle = unmoved[n, kx, ky] & ~attacked[n, kx, ky]
+
+    for side in [-1, 1]:
+        clear = can_castle.copy()
+        rook = np.zeros_like(can_castle)
+        for distance in range(1, SIZE):
+            x = kx + side * distance
+            on_board = (x >= 0) & (x < SIZE)
+            x = np.clip(x, 0, SIZE - 1)
+            cell = positions[n, x, ky]
+            if distance >= 3:
+                rook |= on_board & clear & (cell == ROOK) & unmoved[n, x, ky]
+            clear &= on_board & (cell == 0)
+
+        passing = np.clip(kx + side, 0, SIZE - 1)
+        target = kx + side * 2
+        rook &= ~attacked[n, passing, ky] & ~attacked[n, np.clip(target, 0, SIZE - 1), ky]
+        moves[n[rook], kx[rook], ky[rook], target[rook], ky[rook]] = True
+
+    return moves
+
+
+def _legal_moves(positions, unmoved):
+    '''
+    Legal moves for the positive pieces of positions, which move towards y = 7.
+    '''
+    count = len(positions)
+    attacked = _attacks(positions)
+
+    kings = positions == KING
+    has_king = kings.any(axis=(1, 2))
+    king_x, king_y = np.divmod(kings.reshape(count, -1).argmax(axis=1), SIZE)
+    in_check = has_king & attacked[np.arange(count), king_x, king_y]
+
+    moves = _pseudo_legal_moves(positions, unmoved)
+
+    # Play out every move, and drop those that leave the King threatened.
+    n, from_x, from_y, to_x, to_y = np.nonzero(moves)
+    if len(n):
+        played = positions[n]
+        index = np.arange(len(n))
+        piece = played[index, from_x, from_y]
+        played[index, to_x, to_y] = piece
+        played[index, from_x, from_y] = 0
+        moved_king = piece == KING
+        threatened = _attacks(played)[index,
+                                      np.where(moved_king, to_x, king_x[n]),
+                                      np.where(moved_king, to_y, king_y[n])]
+        moves[n, from_x, from_y, to_x, to_y] = ~(threatened & has_king[n])
+
+    with_king = np.nonzero(has_king)[0]
+    moves |= _castles(positions, unmoved, attacked, (with_king, king_x[with_king], king_y[with_king]))
+
+    return moves, in_check
+
+
+def legal_move_masks(positions, turn, unmoved=None, chunk_size=1024, masks=True):
+    '''
+    Returns legal move masks, check flags and mobility counts for the player to move
+    in each position. turn holds the direction of the player to move, and unmoved
+    defaults to pieces on their starting squares. Masks are an (N, 8, 8, 8, 8) bool
+    array indexed [n, from_x, from_y, to_x, to_y], or None if masks is False.
+    '''
+    positions = np.asarray(positions, dtype=np.int8)
+    turn = np.asarray(turn, dtype=np.int8).reshape(-1)
+    unmoved = starting_squares(positions) if unmoved is None else np.asarray(unmoved, dtype=bool)
+
+    # Flip positions so the player to move always moves towards y = 7 with positive pieces.
+    flip = turn < 0
+    relative = positions * turn[:, None, None]
+    relative[flip] = relative[flip, :, ::-1]
+    unmoved = unmoved.copy()
+    unmoved[flip] = unmoved[flip, :, ::-1]
+
+    count = len(positions)
+    all_masks = np.zeros(positions.shape + positions.shape[1:], dtype=bool) if masks else None
+    in_check = np.zeros(count, dtype=bool)
+    mobility = np.zeros(count, dtype=np.int32)
+
+    for start in range(0, count, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        moves, in_check[chunk] = _legal_moves(relative[chunk], unmoved[chunk])
+        mobility[chunk] = moves.reshape(len(moves), -1).sum(axis=1)
+        if masks:
+            chunk_flip = flip[chunk]
+            moves[chunk_flip] = moves[chunk_flip][:, :, ::-1, :, ::-1]
+            all_masks[chunk] = moves
+
+    return all_masks, in_check, mobility
+
+
+def starting_squares(positions):
+    '''
+    Guesses which pieces are unmoved from their squares in the standard set up.
+    '''
+    positions = np.asarray(positions)
+    unmoved = np.zeros(positions.shape, dtype=bool)
+    for colour, back, front in [(1, 0, 1), (-1, SIZE - 1, SIZE - 2)]:
+        unmoved[:, :, front] = positions[:, :, front] == PAWN * colour
+        unmoved[:, 4, back] = positions[:, 4, back] == KING * colour
+        for x in [0, SIZE - 1]:
+            unmoved[:, x, back] = positions[:, x, back] == ROOK * colour
+    return unmoved
+
+
+def encode(board):
+    '''
+    Encodes a Chessboard as a position and unmoved array.
+    '''
+    position = np.zeros((SIZE, SIZE), dtype=np.int8)
+    unmoved = np.zeros((SIZE, SIZE), dtype=bool)
+    for x in range(SIZE):
+        for y in range(SIZE):
+            piece = board.get(x, y)
+            if piece:
+                position[x, y] = PIECE_CODES[piece.name] * piece.player.direction
+                if piece.name == 'Rook':
+                    unmoved[x, y] = piece in piece.player.castling_rights
+                else:
+                    unmoved[x, y] = piece.name in ['Pawn', 'King'] and not piece.has_moved
+    return position, unmoved
+
+
+def decode(position, unmoved=None):
+    '''
+    Builds a Chessboard and a pair of players, White and Black, from an encoded position.
+    '''
+    position = np.asarray(position)
+    if unmoved is None:
+        unmoved = starting_squares(position[None])[0]
+
+    board, order = Chessboard(), []
+    players = {1: Player('White', 1, players=order), -1: Player('Black', -1, players=order)}
+    for x, y in zip(*np.nonzero(position)):
+        code = int(position[x, y])
+        piece = PIECE_CLASSES[abs(code)](board, players[1 if code > 0 else -1], int(x), int(y))
+        if not unmoved[x, y]:
+            piece.has_moved = True
+            piece.player.castling_rights.discard(piece)
+
+    return board, players[1], players[-1]
+
+
+def object_moves(player):
+    '''
+    Legal move mask, check flag and mobility of a player using the Piece objects.
+    '''
+    mask = np.zeros((SIZE,) * 4, dtype=bool)
+    for piece in player.pieces:
+        for target in piece.legal_moves:
+            mask[piece.position + target] = True
+    in_check = bool(player.king) and player.king.in_check
+    return mask, in_check, int(mask.sum())
+
+
+def differential(positions, turn, unmoved=None):
+    '''
+    Compares the batch results with the Piece objects for every position, returning a
+    list of (index, description) pairs for each position where they disagree.
+    '''
+    positions = np.asarray(positions, dtype=np.int8)
+    turn = np.asarray(turn).reshape(-1)
+    if unmoved is None:
+        unmoved = starting_squares(positions)
+    masks, in_check, mobility = legal_move_masks(positions, turn, unmoved)
+
+    mismatches = []
+    for index, position in enumerate(positions):
+        board, white, black = decode(position, unmoved[index])
+        mask, check, count = object_moves(white if turn[index] > 0 else black)
+
+        if check != in_check[index]:
+            mismatches.append((index, 'in check {} != {}'.format(bool(in_check[index]), check)))
+        if not np.array_equal(mask, masks[index]):
+            extra = [tuple(int(i) for i in move) for move in np.argwhere(masks[index] & ~mask)]
+            missing = [tuple(int(i) for i in move) for move in np.argwhere(mask & ~masks[index])]
+            mismatches.append((index, 'extra moves {}, missing moves {}'.format(extra, missing)))
+
+    return mismatches
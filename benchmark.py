@@ -0,0 +1,362 @@
+'''
+Benchmarks for move generation and search.
+
+$ python benchmark.py search [--depth 3]
+$ python benchmark.py players [--games 5] [--plies 100]
+$ python benchmark.py sizes [--sizes 8 12 16 24] [--plies 100]
+$ python benchmark.py suite [--output results.json] [--baseline baseline.json] [--threshold 0.1]
+      [--history history.jsonl]
+'''
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from random import Random
+from time import perf_counter
+
+import fen
+from chess import Chessboard, Game, Player
+from pieces import set_up_pieces, King, Bishop, Knight, Rook
+from players import RandomPlayer, parse_move
+from search import Search, FEATURES
+from transposition import TranspositionTable
+
+POSITIONS = [
+    fen.START,
+    'r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3',
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+    '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1',
+]
+
+
+def search_configurations():
+    '''
+    Every feature on, every feature off, and each feature switched off alone.
+    '''
+    yield 'all on', {}
+    yield 'all off', {feature: False for feature in FEATURES}
+    for feature in FEATURES:
+        yield 'no ' + feature, {feature: False}
+
+
+def bench_search(depth, positions=POSITIONS):
+    '''
+    Returns nodes searched and seconds taken to reach depth on each position, for each configuration.
+    '''
+    results = {}
+    for name, options in search_configurations():
+        nodes, seconds = 0, 0.0
+        for position in positions:
+            board, white, black, player = fen.load(position)
+            search = Search(TranspositionTable(16), **options)
+            start = perf_counter()
+            search.search(player, depth)
+            seconds += perf_counter() - start
+            nodes += search.nodes
+        results[name] = {'nodes': nodes, 'seconds': seconds}
+    return results
+
+
+# Extra armies, each a king and three pieces, fitted between White and Black's pawns
+# where neither they nor anyone else starts in check.
+ARMIES = [
+    ('Red', 1, 3, [King, Bishop, Knight, Rook]),
+    ('Blue', -1, 4, [Rook, Knight, Bishop, King]),
+]
+
+
+def multiplayer_game(count):
+    '''
+    Sets up a Game of count players, two to four, with White and Black in their usual places.
+    '''
+    board, players = Chessboard(), []
+    for name, direction in [('White', 1), ('Black', -1)]:
+        set_up_pieces(board, Player(name, direction, players=players))
+    for name, direction, row, army in ARMIES[:count - 2]:
+        player = Player(name, direction, players=players)
+        for x, piece in enumerate(army, 0 if direction == 1 else 4):
+            piece(board, player, x, row)
+    return Game(board, players)
+
+
+def bench_players(games=5, plies=100, seed=0):
+    '''
+    Returns plies played and seconds taken over seeded random games of 2, 3 and 4 players.
+    '''
+    results = {}
+    for count in [2, 3, 4]:
+        played, seconds = 0, 0.0
+        for game_seed in range(seed, seed + games):
+            random = Random(game_seed)
+            game = multiplayer_game(count)
+            start = perf_counter()
+            while game.result is None and game.moves < plies:
+                piece, target = random.choice(list(game.current_player.iter_legal_moves()))
+                game.move(piece.position, target)
+            seconds += perf_counter() - start
+            played += game.moves
+        results['{} players'.format(count)] = {'plies': played, 'seconds': seconds}
+    return results
+
+
+PROPERTIES = {
+    'threatens': lambda player: [piece.threatens for piece in player.pieces],
+    'legal_moves': lambda player: [piece.legal_moves for piece in player.pieces],
+    'threatened_by': lambda player: player.king.threatened_by,
+    'defensive_moves': lambda player: player.king.defensive_moves,
+    'blocked_directions': lambda player: player.king.blocked_directions,
+    'castles': lambda player: player.king.castles,
+}
+
+# Leaf nodes of the starting position at depth 3, and of Kiwipete at depth 2, which is
+# one fewer than the usual 2039 as En Passant isn't played.
+PERFT = [(POSITIONS[0], 3, 8902), (POSITIONS[2], 2, 2038)]
+
+
+def rate(function, repeat=5, minimum=0.05):
+    '''
+    Returns the best calls per second of function over repeat runs of at least minimum seconds.
+    '''
+    best = 0.0
+    for run in range(repeat):
+        calls, start = 0, perf_counter()
+        while True:
+            function()
+            calls += 1
+            seconds = perf_counter() - start
+            if seconds >= minimum:
+                break
+        best = max(best, calls / seconds)
+    return best
+
+
+def bench_properties(positions=POSITIONS, repeat=5):
+    '''
+    Returns calls per second of each hot property, for every piece of the player to move,
+    or for their king, summed over the positions.
+    '''
+    results = {}
+    for name, query in PROPERTIES.items():
+        seconds = 0.0
+        for position in positions:
+            board, white, black, player = fen.load(position)
+
+            def call():
+                board.version += 1  # Don't let results kept from the last call answer this one
+                query(player)
+
+            seconds += 1 / rate(call, repeat)
+        results[name] = len(positions) / seconds
+    return results
+
+
+def perft(board, players, turn, depth):
+    '''
+    Counts the positions reached after depth plies of every legal move.
+    '''
+    player = players[turn]
+    if depth == 1:
+        return sum(1 for move in player.iter_legal_moves())
+
+    nodes = 0
+    for piece, target in list(player.iter_legal_moves()):
+        child_board, child_players = board.snapshot(players)
+        child_board.get(*piece.position).move(*target)
+        nodes += perft(child_board, child_players, (turn + 1) % len(players), depth - 1)
+    return nodes
+
+
+def bench_perft(positions=PERFT):
+    '''
+    Returns perft nodes per second over the positions.
+    '''
+    nodes, seconds = 0, 0.0
+    for position, depth, expected in positions:
+        board, white, black, player = fen.load(position)
+        start = perf_counter()
+        count = perft(board, player.players, player.players.index(player), depth)
+        seconds += perf_counter() - start
+        if count != expected:
+            raise AssertionError('perft({}) of {} is {}, not {}'.format(depth, position, count, expected))
+        nodes += count
+    return nodes / seconds
+
+
+def random_game(seed, plies=200):
+    '''
+    Plays a RandomPlayer game seeded with seed, cut off at plies, returning the moves
+    played and the seconds taken.
+    '''
+    state = random.getstate()
+    try:
+        random.seed(seed)
+        board, players = Chessboard(), []
+        for name, direction in [('White', 1), ('Black', -1)]:
+            set_up_pieces(board, RandomPlayer(name, direction, players=players))
+        game = Game(board, players)
+
+        moves = []
+        start = perf_counter()
+        while game.result is None and game.moves < plies:
+            moves.append(game.current_player.play_turn())
+            game.move(*parse_move(moves[-1]))
+        return moves, perf_counter() - start
+    finally:
+        random.setstate(state)
+
+
+def bench_random_games(games=5, plies=200, seed=0):
+    '''
+    Returns games per second of seeded RandomPlayer games, each cut off at plies.
+    '''
+    seconds = sum(random_game(game_seed, plies)[1] for game_seed in range(seed, seed + games))
+    return games / seconds
+
+
+def pad_position(position, size):
+    '''
+    Returns position on a board of size by size, with empty files and ranks added in the
+    middle, so the pieces, and the Rooks in the corners, stay where they were relative to
+    the edges.
+    '''
+    placement, rest = position.split(' ', 1)
+    rows = []
+    for row in placement.split('/'):
+        squares = ''.join('.' * int(square) if square.isdigit() else square for square in row)
+        rows.append(squares[:4] + '.' * (size - 8) + squares[4:])
+    rows[4:4] = ['.' * size] * (size - 8)
+    return '/'.join(re.sub(r'\.+', lambda empty: str(len(empty.group())), row) for row in rows) + ' ' + rest
+
+
+def full_armies(size):
+    '''
+    Sets up White and Black with full back ranks and pawns on a board of size by size.
+    '''
+    board, players = Chessboard(size, size), []
+    for name, direction in [('White', 1), ('Black', -1)]:
+        set_up_pieces(board, Player(name, direction, players=players))
+    return board, players
+
+
+def bench_sizes(sizes=(8, 12, 16, 24), plies=100, seed=0, repeat=3):
+    '''
+    Returns rates of legal move generation, snapshots and random plies on boards of each
+    size, both for Kiwipete's pieces spread over the bigger board and for full armies.
+    '''
+    results = {}
+    for size in sizes:
+        board, white, black, player = fen.load(pad_position(POSITIONS[2], size))
+        setups = {'kiwipete': (board, player.players), 'armies': full_armies(size)}
+        for name, (board, players) in setups.items():
+            player = players[0]
+
+            def legal_moves():
+                board.version += 1  # Don't let results kept from the last call answer this one
+                list(player.iter_legal_moves())
+
+            random = Random(seed)
+            game = Game(*board.snapshot(players))
+            start = perf_counter()
+            while game.result is None and game.moves < plies:
+                piece, target = random.choice(list(game.current_player.iter_legal_moves()))
+                game.move(piece.position, target)
+            seconds = perf_counter() - start
+            results['{}x{} {}'.format(size, size, name)] = {
+                'pieces': sum(len(each_player.pieces) for each_player in players),
+                'legal_moves_per_second': rate(legal_moves, repeat),
+                'snapshots_per_second': rate(lambda: board.snapshot(players), repeat),
+                'plies_per_second': game.moves / seconds,
+            }
+    return results
+
+
+def machine():
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'python': '{} {}'.format(platform.python_implementation(), platform.python_version()),
+    }
+
+
+def suite():
+    '''
+    Runs every benchmark, returning machine metadata and a dict of metrics, each a rate
+    where higher is better.
+    '''
+    metrics = {'{}_per_second'.format(name): value for name, value in bench_properties().items()}
+    metrics['perft_nodes_per_second'] = bench_perft()
+    metrics['random_games_per_second'] = bench_random_games()
+    return {
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': machine(),
+        'metrics': metrics,
+    }
+
+
+def regressions(results, baseline, threshold=0.1):
+    '''
+    Returns (metric, baseline rate, rate) for each metric that has fallen more than
+    threshold, as a fraction, below the baseline.
+    '''
+    return [(name, baseline['metrics'][name], value) for name, value in results['metrics'].items()
+            if name in baseline['metrics'] and value < baseline['metrics'][name] * (1 - threshold)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    search_parser = subparsers.add_parser('search', help='nodes and time to reach a fixed depth')
+    search_parser.add_argument('--depth', type=int, default=3)
+    players_parser = subparsers.add_parser('players', help='plies per second of random games of 2, 3 and 4 players')
+    players_parser.add_argument('--games', type=int, default=5)
+    players_parser.add_argument('--plies', type=int, default=100)
+    sizes_parser = subparsers.add_parser('sizes', help='rates of move generation, snapshots and random plies by board size')
+    sizes_parser.add_argument('--sizes', type=int, nargs='+', default=[8, 12, 16, 24])
+    sizes_parser.add_argument('--plies', type=int, default=100)
+    suite_parser = subparsers.add_parser('suite', help='rates of the hot properties, perft and random games')
+    suite_parser.add_argument('--output', help='file to write the results to as JSON')
+    suite_parser.add_argument('--baseline', help='results to compare against, failing on any regression')
+    suite_parser.add_argument('--threshold', type=float, default=0.1, help='fraction a rate may fall by')
+    suite_parser.add_argument('--history', help='file of JSON lines to append the results to')
+    args = parser.parse_args()
+
+    if args.benchmark == 'search':
+        print('{:<26} {:>10} {:>10}'.format('configuration', 'nodes', 'seconds'))
+        for name, result in bench_search(args.depth).items():
+            print('{:<26} {:>10} {:>10.2f}'.format(name, result['nodes'], result['seconds']))
+
+    elif args.benchmark == 'players':
+        print('{:<26} {:>10} {:>10} {:>12}'.format('players', 'plies', 'seconds', 'plies/s'))
+        for name, result in bench_players(args.games, args.plies).items():
+            print('{:<26} {:>10} {:>10.2f} {:>12.1f}'.format(name, result['plies'], result['seconds'],
+                                                           result['plies'] / result['seconds']))
+
+    elif args.benchmark == 'sizes':
+        print('{:<20} {:>7} {:>14} {:>14} {:>10}'.format('board', 'pieces', 'legal moves/s', 'snapshots/s', 'plies/s'))
+        for name, result in bench_sizes(args.sizes, args.plies).items():
+            print('{:<20} {:>7} {:>14.1f} {:>14.1f} {:>10.1f}'.format(
+                name, result['pieces'], result['legal_moves_per_second'], result['snapshots_per_second'],
+                result['plies_per_second']))
+
+    elif args.benchmark == 'suite':
+        results = suite()
+        for name, value in results['metrics'].items():
+            print('{:<36} {:>14.1f}'.format(name, value))
+        if args.output:
+            with open(args.output, 'w') as output:
+                json.dump(results, output, indent=2)
+        if args.history:
+            with open(args.history, 'a') as history:
+                history.write(json.dumps(results) + '\n')
+        if args.baseline:
+            with open(args.baseline) as baseline:
+                failures = regressions(results, json.load(baseline), args.threshold)
+            for name, expected, value in failures:
+                print('{} regressed by {:.0%}, from {:.1f} to {:.1f}'.format(name, 1 - value / expected, expected, value))
+            sys.exit(1 if failures else 0)
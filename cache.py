@@ -0,0 +1,135 @@
+'''
+A persistent cache of analysed positions, kept in a local SQLite database and keyed
+by canonical.canonical_key. Each entry holds the depth searched, the score and the
+best move, in the canonical form of the position. The database uses write-ahead
+logging so many processes can read it while one writes, and each process opens its
+own connection. Writes are buffered and inserted in batches, and the oldest entries
+are evicted when the database outgrows max_mb.
+'''
+import os
+import sqlite3
+from collections import namedtuple
+from time import time
+
+from transposition import pack_move, unpack_move
+
+CachedAnalysis = namedtuple('CachedAnalysis', ['depth', 'score', 'move'])
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS positions (
+    key INTEGER PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    stored REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS positions_stored ON positions (stored);
+'''
+
+
+def signed(key):
+    # SQLite integers are signed 64 bit.
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+class AnalysisCache:
+    def __init__(self, path, max_mb=256, batch_size=500):
+        self.path = path
+        self.max_bytes = max_mb * 2 ** 20
+        self.batch_size = batch_size
+        self.pending = []
+        self.hits = self.misses = 0
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self):
+        if self._pid != os.getpid():  # Don't share a connection with a parent process
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key, depth=0):
+        '''
+        Returns the CachedAnalysis of a position searched to at least depth, or None,
+        including analyses still waiting to be written.
+        '''
+        for pending_key, pending_depth, score, move, stored in reversed(self.pending):
+            if pending_key == signed(key) and pending_depth >= depth:
+                self.hits += 1
+                return CachedAnalysis(pending_depth, score, unpack_move(move))
+        row = self.connection.execute('SELECT depth, score, move FROM positions WHERE key = ? AND depth >= ?',
+                                      (signed(key), depth)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedAnalysis(row[0], row[1], unpack_move(row[2]))
+
+    def put(self, key, depth, score, move=None):
+        '''
+        Queues an analysis to be written with the next batch.
+        '''
+        self.pending.append((signed(key), depth, score, pack_move(move), time()))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def put_many(self, analyses):
+        for analysis in analyses:
+            self.put(*analysis)
+        self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO positions (key, depth, score, move, stored) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET depth = excluded.depth, score = excluded.score, '
+                'move = excluded.move, stored = excluded.stored WHERE excluded.depth >= positions.depth',
+                self.pending)
+        self.pending = []
+        self.evict()
+
+    def size(self):
+        '''
+        Bytes of the database in use by entries.
+        '''
+        pages = self.connection.execute('PRAGMA page_count').fetchone()[0]
+        free = self.connection.execute('PRAGMA freelist_count').fetchone()[0]
+        return (pages - free) * self.connection.execute('PRAGMA page_size').fetchone()[0]
+
+    def evict(self):
+        '''
+        Deletes the least recently stored entries when the database outgrows max_mb,
+        leaving a tenth of the space free for new entries.
+        '''
+        size, count = self.size(), len(self)
+        while size > self.max_bytes and count:
+            keep = int(count * self.max_bytes * 0.9 / size)
+            with self.connection:
+                self.connection.execute('DELETE FROM positions WHERE key IN '
+                                        '(SELECT key FROM positions ORDER BY stored LIMIT ?)', (count - keep,))
+            size, count = self.size(), len(self)
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM positions').fetchone()[0]
+
+    def close(self):
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = self._pid = None
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self),
+            'bytes': self.size(),
+        }
@@ -0,0 +1,76 @@
+'''
+Canonical forms of positions, so that stores keyed by position share one entry between
+positions that are the same game seen another way round.
+
+A two player position with Black to move is the colour flip of one with White to move,
+turning the board over top to bottom, so every position is keyed from the point of view
+of the player to move, as if they were White. Positions without Pawns or castling rights
+are also the same mirrored left to right, and the mirror image with the lower key is used.
+
+canonical_key returns a key along with the Transform taking the position to its canonical
+form. Moves stored with the key are transformed on the way in and back on the way out,
+and as each transform is its own inverse transform_move does both.
+'''
+from collections import namedtuple
+
+from zobrist import zobrist, position_key
+
+Transform = namedtuple('Transform', ['flip', 'mirror'])
+IDENTITY = Transform(False, False)
+
+
+def unmoved(piece):
+    return piece in piece.player.castling_rights or (piece.name in ['Pawn', 'King'] and not piece.has_moved)
+
+
+def mirrors(players):
+    '''
+    Returns True if positions of players' game are the same mirrored left to right.
+    '''
+    return not any(player.castling_rights or any(piece.name == 'Pawn' for piece in player.pieces)
+                   for player in players)
+
+
+def canonical_key(player):
+    '''
+    Returns the key of the canonical form of the position of player's game, with player to
+    move, and the Transform to it. Games of more than two players, or two on the same side,
+    are keyed as they are.
+    '''
+    players = player.players
+    if len(players) != 2 or players[0].direction == players[1].direction:
+        return position_key(player), IDENTITY
+
+    board = player.pieces[0].board
+    width, height = len(board), len(board[0])
+    flip = player.direction == -1
+    mirror = mirrors(players)
+
+    key = mirrored_key = 0
+    for each_player in players:
+        side = 1 if each_player is player else -1
+        for piece in each_player.pieces:
+            y = height - 1 - piece.y if flip else piece.y
+            key ^= zobrist(piece.name, side, piece.x, y)
+            if mirror:
+                mirrored_key ^= zobrist(piece.name, side, width - 1 - piece.x, y)
+            elif unmoved(piece):
+                key ^= zobrist('unmoved', piece.x, y)
+
+    if mirror and mirrored_key < key:
+        return mirrored_key, Transform(flip, True)
+    return key, Transform(flip, False)
+
+
+def transform_position(board, position, transform):
+    x, y = position
+    return (len(board) - 1 - x if transform.mirror else x, len(board[0]) - 1 - y if transform.flip else y)
+
+
+def transform_move(board, move, transform):
+    '''
+    Transforms a move to or from the canonical form of a position on board.
+    '''
+    if move is None or transform == IDENTITY:
+        return move
+    return transform_position(board, move[0], transform), transform_position(board, move[1], transform)
@@ -1,41 +1,118 @@
+def copy(instance):
+    '''
+    A faster shallow copy than copy.copy for the plain classes used here.
+    '''
+    duplicate = object.__new__(instance.__class__)
+    duplicate.__dict__.update(instance.__dict__)
+    return duplicate
+
+
+class Column:
+    '''
+    A view of one file of a Chessboard, so squares can be read as board[x][y].
+    '''
+    __slots__ = ['board', 'x']
+
+    def __init__(self, board, x):
+        self.board = board
+        self.x = x
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.board.height:
+            raise IndexError(y)
+        return self.board.get(self.x, y)
+
+    def __len__(self):
+        return self.board.height
+
+    def __iter__(self):
+        return (self.board.get(self.x, y) for y in range(self.board.height))
+
+
 class Chessboard:
-    def __init__(self):
-        self._board = [[None] * 8 for n in range(8)]
+    '''
+    A board of width files by height ranks. Only occupied squares are stored, in a dict
+    keyed by position, so the cost of working with a board, or taking a snapshot of it,
+    depends on the number of pieces rather than the number of squares.
+    '''
+
+    def __init__(self, width=8, height=8):
+        self.width = width
+        self.height = height
+        self._pieces = {}
+        self.version = 0  # Counts changes to the board, so results worked out from it can be kept until it changes
+        self.pawn_key = 0  # Zobrist key of the Pawns alone, kept up to date by the Pawns
 
     def __str__(self):
-        return '{}x{} Chessboard'.format(len(self._board), len(self._board[0]))
+        return '{}x{} Chessboard'.format(self.width, self.height)
 
-    def __getitem__(self, key):
-        return self._board[key]
+    def __getitem__(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError(x)
+        return Column(self, x)
 
     def __len__(self):
-        return len(self._board)
+        return self.width
+
+    def __iter__(self):
+        return (Column(self, x) for x in range(self.width))
 
     def get(self, x, y):
-        if x >= 0 and y >= 0:
-            try:
-                return self._board[x][y]
-            except IndexError:
-                return False
-        else:
-            return False
+        '''
+        Returns the piece at x, y, None for an empty square, or False off the board.
+        '''
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self._pieces.get((x, y))
+        return False
 
     def set(self, x, y, value):
-        self._board[x][y] = value
+        self._pieces[(x, y)] = value
+        self.version += 1
 
     def blank(self, x, y):
-        self._board[x][y] = None
+        self._pieces.pop((x, y), None)
+        self.version += 1
+
+    def snapshot(self, players):
+        '''
+        Returns an independent copy of the board and its players, in the same order, that
+        can be played on without affecting the originals. Pieces of players not given are left off.
+        '''
+        board = copy(self)
+        board._pieces = {}
+        snapshot_players = [copy(player) for player in players]
+
+        for player, snapshot_player in zip(players, snapshot_players):
+            snapshot_player.players = snapshot_players
+            snapshot_player.pieces = []
+            snapshot_player.king = False  # Unless the king is still on the board
+            snapshot_player.castling_rights = set()
+            for piece in player.pieces:
+                snapshot_piece = copy(piece)
+                snapshot_piece.board, snapshot_piece.player = board, snapshot_player
+                snapshot_player.pieces.append(snapshot_piece)
+                board._pieces[piece.position] = snapshot_piece
+                if piece is player.king:
+                    snapshot_player.king = snapshot_piece
+                if piece in player.castling_rights:
+                    snapshot_player.castling_rights.add(snapshot_piece)
+
+        return board, snapshot_players
 
 
 class Player:
     players = []
 
-    def __init__(self, name, direction):
+    def __init__(self, name, direction, players=None):
+        if players is not None:  # Join a separate game, rather than the shared list of players
+            self.players = players
         self.name = name
         self.pieces = []
         self.direction = direction
         self.score = 0
         self.king = False
+        self.castling_rights = set()  # Rooks that have not moved, and so may still castle with the king.
+        self._attack_map = self._threats = (None, None, None)
         self.players.append(self)
 
     def __str__(self):
@@ -45,6 +122,57 @@ class Player:
     def opponents(self):
         return [player for player in self.players if player is not self]
 
+    @property
+    def board(self):
+        return self.pieces[0].board if self.pieces else None
+
+    @property
+    def attack_map(self):
+        '''
+        A dict of the positions this player's pieces threaten, to the pieces threatening
+        them, worked out once for each version of the board.
+        '''
+        board = self.board
+        cached_board, version, attack_map = self._attack_map
+        if board is None or cached_board is not board or version != board.version:
+            attack_map = {}
+            for piece in self.pieces:
+                for position in piece.iter_threatens():
+                    attack_map.setdefault(position, []).append(piece)
+            self._attack_map = (board, board and board.version, attack_map)
+        return attack_map
+
+    @property
+    def threats(self):
+        '''
+        The attack maps of all opponents combined, so that each position attacked by any
+        opponent is looked up once, however many opponents there are. Each opponent's own
+        map is shared with the other players it threatens.
+        '''
+        board = self.board
+        cached_board, version, threats = self._threats
+        if board is None or cached_board is not board or version != board.version:
+            opponents = self.opponents
+            if len(opponents) == 1:
+                threats = opponents[0].attack_map
+            else:
+                threats = {}
+                for opponent in opponents:
+                    for position, pieces in opponent.attack_map.items():
+                        threats[position] = threats[position] + pieces if position in threats else pieces
+            self._threats = (board, board and board.version, threats)
+        return threats
+
+    def iter_legal_moves(self):
+        '''
+        Yields (piece, position) for each legal move, working out the constraints
+        on the king's defenders once for all pieces.
+        '''
+        constraints = self.king.constraints if self.king else None
+        for piece in list(self.pieces):
+            for position in piece.iter_legal_moves(constraints):
+                yield piece, position
+
 
 class Piece:
     '''
@@ -58,11 +186,11 @@ class Piece:
 
     def __init__(self, board, player, x, y):
         self.board = board
-        self._x = (len(self.board) + x) % len(self.board)
-        self._y = (len(self.board[0]) + y) % len(self.board[0])
+        self._x = (board.width + x) % board.width
+        self._y = (board.height + y) % board.height
         self.player = player
         player.pieces.append(self)
-        board.set(x, y, self)
+        board.set(*self.position, self)
         self.has_moved = False
 
     def __str__(self):
@@ -76,32 +204,44 @@ class Piece:
         '''
         Returns a list of tuples for legal moves.
         '''
-        return {position for position in self.threatens
-                if self.board.get(*position) is None or
-                self.board.get(*position).player is not self.player}
+        return set(self.iter_legal_moves())
+
+    def iter_legal_moves(self, constraints=None):
+        '''
+        Yields legal moves as they are found. constraints may pass in the king's
+        (defensive_moves, blocked_directions) when they are already known.
+        '''
+        return self.iter_moves()
+
+    def iter_moves(self):
+        '''
+        Yields moves to empty or opponent occupied positions, ignoring the safety of the king.
+        '''
+        for position in self.iter_threatens():
+            target_piece = self.board.get(*position)
+            if target_piece is None or target_piece.player is not self.player:
+                yield position
 
     @property
     def threatens(self):
-        threatens = set()
+        return set(self.iter_threatens())
 
+    def iter_threatens(self):
         for position in self.moves:
             target = self.positionRelative(position)
-            target_piece = self.board.get(*target)
-            if target_piece is not False:
-                threatens.add(target)
+            if self.board.get(*target) is not False:
+                yield target
 
         for direction in self.move_directions:
             target = self.positionRelative(direction)
             target_piece = self.board.get(*target)
             while target_piece is None:
-                threatens.add(target)
+                yield target
                 target = self.advancePosition(target, direction)
                 target_piece = self.board.get(*target)
             else:
                 if target_piece:
-                    threatens.add(target)
-
-        return threatens
+                    yield target
 
     @property
     def x(self):
@@ -133,9 +273,10 @@ class Piece:
         if (x, y) in self.legal_moves:
             self.board.blank(*self.position)
 
-            if self.board.get(x, y):
-                self.player.score += self.board[x][y].value
-                self.board[x][y].kill()
+            target_piece = self.board.get(x, y)
+            if target_piece:
+                self.player.score += target_piece.value
+                target_piece.kill()
 
             self._x, self._y = (x, y)
             self.board.set(x, y, self)
@@ -146,3 +287,81 @@ class Piece:
 
     def kill(self):
         self.player.pieces.remove(self)
+
+
+class Game:
+    '''
+    Plays a game on a board between any number of players, taking turns in the order of
+    players. While more than two are playing, a player left without a legal move, or whose
+    king is taken, is knocked out and their pieces taken off the board. With two players
+    left, check mate wins and stalemate is a draw, leaving the final position on the board.
+    '''
+
+    def __init__(self, board, players=None):
+        self.board = board
+        if players is None:
+            players = list(Player.players)
+            for player in players:
+                player.players = players  # Knock out players from this game's list, not the shared one
+        self.players = players
+        self.turn = 0
+        self.moves = 0
+        self.knocked_out = []
+        self.result = None
+
+    @property
+    def current_player(self):
+        return self.players[self.turn]
+
+    def move(self, start, target):
+        '''
+        Moves the current player's piece at start to target and passes the turn on to the
+        next player still in the game. Returns False if the move isn't legal.
+        '''
+        piece = self.board.get(*start)
+        if self.result or not piece or piece.player is not self.current_player or not piece.move(*target):
+            return False
+
+        self.moves += 1
+        self.turn = (self.turn + 1) % len(self.players)
+        self.update_result()
+        return True
+
+    def update_result(self):
+        for player in list(self.players):
+            if player.king and player.king not in player.pieces:  # With more than two players kings can be taken
+                self.knock_out(player)
+
+        while self.result is None:
+            player = self.current_player
+            if len(self.players) == 1:
+                self.result = 'Check mate, {} wins.'.format(player)
+            elif all(len(each_player.pieces) == 1 for each_player in self.players):
+                self.result = 'Game draw!'
+            elif next(player.iter_legal_moves(), None) is None:
+                if len(self.players) == 2:  # Leave the final position on the board
+                    if player.king and player.king.in_check:
+                        winner = next(each_player for each_player in self.players if each_player is not player)
+                        self.result = 'Check mate, {} wins.'.format(winner)
+                    else:
+                        self.result = 'Stalemate. Game draw!'
+                else:
+                    self.knock_out(player)
+            else:
+                break
+
+    def knock_out(self, player):
+        for piece in list(player.pieces):
+            self.board.blank(*piece.position)
+            piece.kill()
+        index = self.players.index(player)
+        del self.players[index]
+        self.knocked_out.append(player)
+        self.board.pawn_key = 0  # Pawns are keyed by their player's place, which has moved up for those after
+        for each_player in self.players:
+            for piece in each_player.pieces:
+                if piece.name == 'Pawn':
+                    self.board.pawn_key ^= piece.key
+        if index < self.turn:
+            self.turn -= 1
+        self.turn %= len(self.players)
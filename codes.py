@@ -0,0 +1,6 @@
+'''
+The codes of the pieces in encoded positions, shared by batch move generation and the
+evaluation service.
+'''
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+PIECE_CODES = {'Pawn': PAWN, 'Knight': KNIGHT, 'Bishop': BISHOP, 'Rook': ROOK, 'Queen': QUEEN, 'King': KING}
@@ -14,9 +14,9 @@ def print_board(board, scale=False):
         if scale:
             result += Back.BLACK + Fore.WHITE
             if scale == 'positions':
-                result += LETTERS.upper()[ri] + ' '
+                result += '{:<2}'.format(LETTERS.upper()[ri])
             else:
-                result += str(ri) + ' '
+                result += '{:<2}'.format(ri)
         for pi, position in enumerate(row):
             result += Back.BLUE if (pi + ri) % 2 else Back.RED
             if position:
@@ -25,7 +25,7 @@ def print_board(board, scale=False):
                 result += '  '
         result += Back.BLACK + '\n'
     if scale:
-        result += Back.BLACK + Fore.WHITE + '  ' + ' '.join([str(i + (1 if scale == 'positions' else 0)) for i in range(len(board))])
+        result += Back.BLACK + Fore.WHITE + '  ' + ''.join('{:<2}'.format(i + (1 if scale == 'positions' else 0)) for i in range(len(board[0])))
     print(result + Style.RESET_ALL)
 
 
@@ -0,0 +1,121 @@
+'''
+A service evaluating positions in batches, for evaluation models that score many
+positions in one call far faster than one at a time.
+
+Searches and playouts running on many threads submit leaf positions and get back a
+Future. A worker thread waits for the first position of a batch, then collects more
+until the batch holds max_batch_size positions or max_wait seconds have passed, and
+scores the whole batch with a single call to the model.
+
+A position is encoded as a tuple of piece codes, indexed [x * height + y] like the
+Chessboard, using the codes of codes.py shared with batch.py, positive for the pieces
+of the player to move and negative for their opponents'. A model is any callable
+taking a list of encoded positions and returning a score for each, for the player to
+move. MaterialModel is a pure Python stand-in, which scores positions on material in
+centipawns like evaluate.
+'''
+import threading
+from concurrent.futures import Future
+from queue import Queue, Empty
+from time import perf_counter
+
+from codes import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_CODES
+
+PIECE_VALUES = {PAWN: 100, KNIGHT: 300, BISHOP: 300, ROOK: 500, QUEEN: 900, KING: 0}  # In centipawns, like search.evaluate
+
+
+def encode(player):
+    '''
+    Encodes the position of player's game, with player to move.
+    '''
+    board = player.pieces[0].board
+    height = len(board[0])
+    position = [0] * (len(board) * height)
+    for each_player in player.players:
+        sign = 1 if each_player is player else -1
+        for piece in each_player.pieces:
+            position[piece.x * height + piece.y] = PIECE_CODES[piece.name] * sign
+    return tuple(position)
+
+
+class MaterialModel:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, positions):
+        self.calls += 1
+        return [sum(PIECE_VALUES[code] if code > 0 else -PIECE_VALUES[-code] for code in position if code)
+                for position in positions]
+
+
+class EvaluationService:
+    def __init__(self, model, max_batch_size=64, max_wait=0.002):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.requests = Queue()
+        self.batches = self.positions = 0
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def submit(self, position):
+        '''
+        Queues an encoded position, returning a Future of its score.
+        '''
+        future = Future()
+        self.requests.put((position, future))
+        return future
+
+    def evaluate(self, player):
+        '''
+        Scores the position of player's game for player, waiting for its batch.
+        '''
+        return self.submit(encode(player)).result()
+
+    def close(self):
+        self.requests.put(None)
+        self._worker.join()
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self.requests.get(timeout=max(deadline - perf_counter(), 0))
+                except Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)  # Finish this batch, then stop
+                    break
+                batch.append(request)
+            self._evaluate(batch)
+
+    def _evaluate(self, batch):
+        try:
+            scores = self.model([position for position, future in batch])
+        except Exception as error:
+            for position, future in batch:
+                future.set_exception(error)
+            return
+        self.batches += 1
+        self.positions += len(batch)
+        for (position, future), score in zip(batch, scores):
+            future.set_result(score)
+
+    @property
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'positions': self.positions,
+            'mean_batch_size': self.positions / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,82 @@
+'''
+Static exchange evaluation, working out the material won or lost by a capture once
+every piece attacking its target square has joined in, without moving any pieces.
+'''
+from pieces import Queen
+
+KING_EXCHANGE_VALUE = 1000  # Capturing with the king is only safe if nothing can recapture
+
+
+def exchange_value(piece):
+    return KING_EXCHANGE_VALUE if piece is piece.player.king else piece.value
+
+
+def promotes(piece, target):
+    '''
+    Returns True if moving piece to target promotes it, as in Pawn.move.
+    '''
+    return piece.name == 'Pawn' and target[1] == (piece.board.height - 1 if piece.player.direction == 1 else 0)
+
+
+def attacks_through(piece, target, removed):
+    '''
+    Returns True if piece threatens target once the pieces on the removed positions have left.
+    '''
+    if piece.name == 'Pawn':
+        return target in (piece.positionRelative((-1, 1)), piece.positionRelative((1, 1)))
+
+    for move in piece.moves:
+        if piece.positionRelative(move) == target:
+            return True
+
+    d_x, d_y = target[0] - piece.x, target[1] - piece.y
+    if piece.move_directions and (d_x or d_y) and (d_x == 0 or d_y == 0 or abs(d_x) == abs(d_y)):
+        step = (max(min(d_x, 1), -1), max(min(d_y, 1), -1) * piece.player.direction)
+        if step in piece.move_directions:
+            position = piece.positionRelative(step)
+            while position != target:
+                if piece.board.get(*position) is not None and position not in removed:
+                    return False
+                position = piece.advancePosition(position, step)
+            return True
+
+    return False
+
+
+def least_valuable_attacker(pieces, target, removed):
+    attackers = [piece for piece in pieces
+                 if piece.position not in removed and piece.position != target and attacks_through(piece, target, removed)]
+    return min(attackers, key=exchange_value) if attackers else None
+
+
+def static_exchange(board, move):
+    '''
+    Returns the material the player making move expects to win on its target square,
+    if both sides keep recapturing with their least valuable attacker for as long as it pays.
+    '''
+    start, target = move
+    attacker, victim = board.get(*start), board.get(*target)
+    player = attacker.player
+
+    gains = [exchange_value(victim) if victim else 0]
+    on_square = exchange_value(attacker)
+    if promotes(attacker, target):
+        gains[0] += Queen.value - attacker.value
+        on_square = Queen.value
+
+    sides = [[piece for opponent in player.opponents for piece in opponent.pieces], player.pieces]
+    removed = {start}
+    side = 0
+    while True:
+        attacker = least_valuable_attacker(sides[side], target, removed)
+        if attacker is None:
+            break
+        gains.append(on_square - gains[-1])
+        removed.add(attacker.position)
+        on_square = exchange_value(attacker)
+        side = 1 - side
+
+    # Either side may stop recapturing when it would lose out.
+    for index in reversed(range(1, len(gains))):
+        gains[index - 1] = -max(-gains[index - 1], gains[index])
+    return gains[0]
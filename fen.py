@@ -0,0 +1,94 @@
+'''
+Reads and writes positions in Forsyth-Edwards Notation. Files a-h are x 0-7 and
+ranks 1-8 are y 0-7, with White (direction 1) at the bottom. En passant targets are
+ignored, as En Passant isn't played. Boards of other sizes are sized from the ranks
+of the placement, with runs of more than nine empty squares written as 10, 11 and so on.
+'''
+import re
+
+from chess import Chessboard, Player
+from pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+PIECES = {'p': Pawn, 'n': Knight, 'b': Bishop, 'r': Rook, 'q': Queen, 'k': King}
+LETTERS = {piece.name: letter for letter, piece in PIECES.items()}
+FILES = 'abcdefghijklmnopqrstuvwxyz'
+CASTLES = {'K': (1, 1), 'Q': (1, -1), 'k': (-1, 1), 'q': (-1, -1)}  # Direction and side of each castling rook
+
+
+def load(fen, player_classes=(Player, Player)):
+    '''
+    Sets up a new game from a FEN string, returning the board, the White and Black
+    players, and the player to move. The players don't join the shared Player.players.
+    '''
+    fields = fen.split()
+    placement, turn, castling = fields[0], fields[1], fields[2] if len(fields) > 2 else '-'
+
+    rows = [re.findall(r'\d+|[a-zA-Z]', row) for row in reversed(placement.split('/'))]
+    board = Chessboard(sum(int(square) if square.isdigit() else 1 for square in rows[0]), len(rows))
+    players = []
+    white = player_classes[0]('White', 1, players=players)
+    black = player_classes[1]('Black', -1, players=players)
+
+    for rank, row in enumerate(rows):
+        x = 0
+        for square in row:
+            if square.isdigit():
+                x += int(square)
+            else:
+                PIECES[square.lower()](board, white if square.isupper() else black, x, rank)
+                x += 1
+
+    for player in players:
+        row = 0 if player.direction == 1 else len(board[0]) - 1
+        for piece in player.pieces:
+            if piece.name == 'Pawn':
+                piece.has_moved = piece.y != row + player.direction
+            elif piece.name == 'Rook':
+                side = 1 if piece.x == board.width - 1 else -1 if piece.x == 0 else None
+                rights = [letter for letter in castling if CASTLES.get(letter) == (player.direction, side)]
+                if not rights or piece.y != row:
+                    piece.has_moved = True
+                    player.castling_rights.discard(piece)
+        if player.king:
+            player.king.has_moved = not player.castling_rights
+
+    return board, white, black, white if turn == 'w' else black
+
+
+def dump(board, player):
+    '''
+    Writes the position of player's game, with player to move, as a FEN string.
+    '''
+    ranks = []
+    for y in reversed(range(len(board[0]))):
+        row, empty = '', 0
+        for x in range(len(board)):
+            piece = board.get(x, y)
+            if piece:
+                letter = LETTERS[piece.name]
+                row += (str(empty) if empty else '') + (letter.upper() if piece.player.direction == 1 else letter)
+                empty = 0
+            else:
+                empty += 1
+        ranks.append(row + (str(empty) if empty else ''))
+
+    castling = ''
+    for letter, (direction, side) in CASTLES.items():
+        for each_player in player.players:
+            if each_player.direction == direction and each_player.king and not each_player.king.has_moved:
+                if any((rook.x > each_player.king.x) == (side == 1)
+                       for rook in each_player.castling_rights if rook.y == each_player.king.y):
+                    castling += letter
+
+    return '{} {} {} - 0 1'.format('/'.join(ranks), 'w' if player.direction == 1 else 'b', castling or '-')
+
+
+def coordinates(move):
+    '''
+    Writes a move in coordinate notation, as e2e4, or None for no move.
+    '''
+    if move is None:
+        return None
+    (start_x, start_y), (target_x, target_y) = move
+    return '{}{}{}{}'.format(FILES[start_x], start_y + 1, FILES[target_x], target_y + 1)
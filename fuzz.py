@@ -0,0 +1,221 @@
+'''
+Differential fuzz tester comparing move generation against the frozen reference.
+
+Seeded random games are played on the reference implementation and a candidate in
+lockstep. After every move the legal moves, check status and game outcome of the
+player to move are compared, and any failing game is shrunk to a minimal sequence
+of moves that still reproduces the difference.
+
+An implementation is any module, or object, with Chessboard, Player and set_up_pieces
+attributes. It may also supply its own legal_moves(player) to test a fast path, and a
+Game class like chess.Game, whose results are then compared in place of outcome.
+
+$ python fuzz.py [--games 100] [--seed 0] [--plies 300] [--processes 4] [--candidate pieces]
+'''
+import argparse
+import importlib
+import sys
+from multiprocessing import Pool, cpu_count
+from random import Random
+from types import SimpleNamespace
+
+import chess
+import pieces
+import reference
+from console import LETTERS
+
+
+def iter_legal_moves(player):
+    return {(piece.position, target) for piece, target in player.iter_legal_moves()}
+
+
+IMPLEMENTATIONS = {
+    'reference': reference,
+    'pieces': SimpleNamespace(Chessboard=chess.Chessboard, Player=chess.Player, set_up_pieces=pieces.set_up_pieces,
+                              Game=chess.Game),
+    'iter': SimpleNamespace(Chessboard=chess.Chessboard, Player=chess.Player, set_up_pieces=pieces.set_up_pieces,
+                            Game=chess.Game, legal_moves=iter_legal_moves),
+}
+
+
+def load(name):
+    '''
+    Returns a registered implementation, or imports it by module name.
+    '''
+    return IMPLEMENTATIONS[name] if name in IMPLEMENTATIONS else importlib.import_module(name)
+
+
+def legal_moves(player):
+    return {(piece.position, target) for piece in player.pieces for target in piece.legal_moves}
+
+
+def outcome(players, player, moves):
+    '''
+    The result of the game for the player to move, following the rules chess.Game plays
+    two player games by, for implementations without a Game of their own.
+    '''
+    if not moves:
+        return 'checkmate' if player.king and player.king.in_check else 'stalemate'
+    elif all(len(other.pieces) == 1 for other in players):
+        return 'draw'
+
+
+def game_outcome(game):
+    '''
+    The result of a chess.Game in the terms of outcome.
+    '''
+    if game.result is None:
+        return None
+    return {'Stalemate. Game draw!': 'stalemate', 'Game draw!': 'draw'}.get(game.result, 'checkmate')
+
+
+class Game:
+    '''
+    A game between White and Black on one implementation.
+    '''
+
+    def __init__(self, implementation):
+        self.implementation = implementation
+        implementation.Player.players = []
+        self.board = implementation.Chessboard()
+        self.players = [implementation.Player('White', 1), implementation.Player('Black', -1)]
+        for player in self.players:
+            player.players = self.players  # Keep games on the same implementation apart
+            implementation.set_up_pieces(self.board, player)
+        self.turn = 0
+        self.game = implementation.Game(self.board, self.players) if hasattr(implementation, 'Game') else None
+
+    @property
+    def player(self):
+        return self.players[self.turn % len(self.players)]
+
+    def state(self):
+        moves = getattr(self.implementation, 'legal_moves', legal_moves)(self.player)
+        in_check = bool(self.player.king) and self.player.king.in_check
+        result = outcome(self.players, self.player, moves) if self.game is None else game_outcome(self.game)
+        return moves, in_check, result
+
+    def move(self, move):
+        start, target = move
+        if self.game is not None:
+            if not self.game.move(start, target):
+                return False
+        else:
+            piece = self.board.get(*start)
+            if not piece or piece.player is not self.player or not piece.move(*target):
+                return False
+        self.turn += 1
+        return True
+
+
+def compare(expected, actual):
+    '''
+    Describes the differences between two game states, or returns None if they match.
+    '''
+    differences = []
+    for name, first, second in zip(['legal moves', 'in check', 'outcome'], expected, actual):
+        if first != second:
+            if name == 'legal moves':
+                differences.append('missing moves {}, extra moves {}'.format(sorted(first - second),
+                                                                           sorted(second - first)))
+            else:
+                differences.append('{} {} != {}'.format(name, first, second))
+    return '; '.join(differences) or None
+
+
+def replay(candidate, moves):
+    '''
+    Plays moves on the reference and candidate, returning a description of the first
+    difference, or None. Sequences that aren't legal on the reference never fail.
+    '''
+    expected, actual = Game(reference), Game(candidate)
+    for ply in range(len(moves) + 1):
+        state = expected.state()
+        difference = compare(state, actual.state())
+        if difference:
+            return 'ply {}: {}'.format(ply, difference)
+        if ply == len(moves) or state[2] or not expected.move(moves[ply]):
+            return None
+        if not actual.move(moves[ply]):
+            return 'ply {}: candidate refused {}'.format(ply, moves[ply])
+
+
+def random_game(candidate, seed, plies):
+    '''
+    Plays a seeded random game on the reference and candidate, returning the moves up
+    to the first difference, or None if they agreed throughout.
+    '''
+    random = Random(seed)
+    expected, actual = Game(reference), Game(candidate)
+    moves = []
+    for ply in range(plies):
+        state = expected.state()
+        if compare(state, actual.state()):
+            return moves
+        if state[2]:
+            return None
+
+        move = random.choice(sorted(state[0]))
+        expected.move(move)
+        moves.append(move)
+        if not actual.move(move):
+            return moves
+
+
+def shrink(candidate, moves):
+    '''
+    Removes moves from a failing sequence while it still fails, giving a minimal
+    reproduction.
+    '''
+    chunk = len(moves) // 2
+    while chunk:
+        start = 0
+        while start < len(moves):
+            attempt = moves[:start] + moves[start + chunk:]
+            if replay(candidate, attempt):
+                moves = attempt
+            else:
+                start += chunk
+        chunk //= 2
+    return moves
+
+
+def fuzz_seed(arguments):
+    candidate_name, seed, plies = arguments
+    candidate = load(candidate_name)
+    moves = random_game(candidate, seed, plies)
+    if moves is None:
+        return seed, None, None
+    moves = shrink(candidate, moves)
+    return seed, moves, replay(candidate, moves)
+
+
+def fuzz(candidate='pieces', games=100, seed=0, plies=300, processes=None):
+    '''
+    Fuzzes games in parallel, returning a list of (seed, moves, difference) failures.
+    '''
+    jobs = [(candidate, game_seed, plies) for game_seed in range(seed, seed + games)]
+    with Pool(processes or cpu_count()) as pool:
+        results = pool.imap_unordered(fuzz_seed, jobs)
+        return sorted(result for result in results if result[1] is not None)
+
+
+def notation(moves):
+    return ', '.join('{}{} to {}{}'.format(LETTERS[start[0]], start[1] + 1, LETTERS[target[0]], target[1] + 1)
+                     for start, target in moves)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fuzz move generation against the frozen reference.')
+    parser.add_argument('--candidate', default='pieces')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--plies', type=int, default=300)
+    parser.add_argument('--processes', type=int)
+    args = parser.parse_args()
+
+    failures = fuzz(args.candidate, args.games, args.seed, args.plies, args.processes)
+    for seed, moves, difference in failures:
+        print('Seed {}: {}\n    {}'.format(seed, difference, notation(moves)))
+    print('{} of {} games differed from the reference.'.format(len(failures), args.games))
+    sys.exit(1 if failures else 0)
@@ -1,5 +1,6 @@
 from chess import Piece
 from sys import maxsize
+from zobrist import zobrist
 
 CARDINAL_DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
 DIAGONAL_DIRECTIONS = [(1, 1), (-1, 1), (1, -1), (-1, -1)]
@@ -11,27 +12,30 @@ class DefensivePiece(Piece):
     A DefensivePiece will not leave or put a player's king in check.
     '''
 
-    def defend_king(self, legal_moves):
+    def allowed_moves(self, constraints=None):
         '''
-        If the king is in check, or this piece is pinned, constrain its moves to those
-        that are legal to protect the king.
+        Returns the set of positions this piece may move to while protecting the king,
+        or None if the king doesn't constrain it.
         '''
-        if self.player.king:
-            if self.player.king.defensive_moves is not False:  # Constrain legal moves to any defensive moves required by a king in check
-                legal_moves.intersection_update(self.player.king.defensive_moves)
+        if constraints is None:
+            if not self.player.king:
+                return None
+            constraints = self.player.king.constraints
 
-            if self.player.king.blocked_directions:  # Constrain legal moves of pinned pieces to keep the king out of check
-                for blocked_line in self.player.king.blocked_directions:
-                    if self.position in blocked_line:
-                        legal_moves.intersection_update(blocked_line)
+        defensive_moves, blocked_directions = constraints
+        allowed_moves = None if defensive_moves is False else defensive_moves  # Constrain legal moves to any defensive moves required by a king in check
 
-        return legal_moves
+        for blocked_line in blocked_directions:  # Constrain legal moves of pinned pieces to keep the king out of check
+            if self.position in blocked_line:
+                allowed_moves = blocked_line if allowed_moves is None else allowed_moves & blocked_line
 
-    @property
-    def legal_moves(self):
-        legal_moves = super().legal_moves
+        return allowed_moves
 
-        return self.defend_king(legal_moves)
+    def iter_legal_moves(self, constraints=None):
+        allowed_moves = self.allowed_moves(constraints)
+        for position in self.iter_moves():
+            if allowed_moves is None or position in allowed_moves:
+                yield position
 
 
 class Pawn(DefensivePiece):
@@ -43,42 +47,48 @@ class Pawn(DefensivePiece):
     value = 1
     symbol = '♟'
 
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.board.pawn_key ^= self.key
+
     @property
-    def legal_moves(self):
-        legal_moves = set()
+    def key(self):
+        return zobrist('Pawn', self.player.players.index(self.player), self.x, self.y)
 
+    def iter_moves(self):
         # Move forward one space, or two if not yet moved.
         forward_one = self.positionRelative((0, 1))
         if self.board.get(*forward_one) is None:
-            legal_moves.add(forward_one)
+            yield forward_one
             forward_two = self.positionRelative((0, 2))
             if not self.has_moved and self.board.get(*forward_two) is None:
-                legal_moves.add(forward_two)
+                yield forward_two
 
         # Attack only in diagonals.
         for position in [self.positionRelative((-1, 1)), self.positionRelative((1, 1))]:
             piece = self.board.get(*position)
             if piece and piece.player is not self.player:
-                legal_moves.add(position)
-
-        return self.defend_king(legal_moves)
+                yield position
 
-    @property
-    def threatens(self):
-        threatens = set()
+    def iter_threatens(self):
         for position in [self.positionRelative((-1, 1)), self.positionRelative((1, 1))]:
             if self.board.get(*position) is not False:
-                threatens.add(position)
-
-        return threatens
+                yield position
 
     def move(self, *args):
+        key = self.key
         moved = super().move(*args)
-        if moved and self.y == (len(self.board[0]) - 1) + ((self.player.direction // 2) * (len(self.board[0]) - 1)):
+        if moved:
+            self.board.pawn_key ^= key ^ self.key
+        if moved and self.y == (self.board.height - 1 if self.player.direction == 1 else 0):
             self.kill()
             Queen(self.board, self.player, *self.position)
         return moved
 
+    def kill(self):
+        super().kill()
+        self.board.pawn_key ^= self.key
+
 
 class King(Piece):
     name = 'King'
@@ -92,19 +102,17 @@ class King(Piece):
 
     @property
     def legal_moves(self):
-        legal_moves = super().legal_moves
+        legal_moves = set(self.iter_moves())
 
         legal_moves.update(self.castles)
 
         # Remove legal moves that put the king in check.
+        legal_moves.difference_update(self.player.threats)
 
-        for opponent in self.player.opponents:
-            for threats in [piece.threatens for piece in opponent.pieces]:
-                legal_moves.difference_update(threats)
-
-        if self.threatened_by:
+        threatened_by = self.threatened_by
+        if threatened_by:
             blocked_by_self = set()
-            for attacker in self.threatened_by:
+            for attacker in threatened_by:
                 if attacker.move_directions:  # If the threat can be blocked
                     direction = (attacker.x - self.player.king.x,
                                  attacker.y - self.player.king.y)
@@ -115,39 +123,47 @@ class King(Piece):
 
         return legal_moves
 
+    def iter_legal_moves(self, constraints=None):
+        return iter(self.legal_moves)
+
     @property
     def castles(self):
         '''
         Returns target positions for possible castle moves.
         '''
-        if self.has_moved:
+        if self.has_moved or not self.player.castling_rights or self.is_attacked(self.position):
             return set()
 
         castle_moves = set()
 
-        castle_positions = {self.positionRelative(position) for position in CARDINAL_DIRECTIONS}
-        for rook in [piece for piece in self.player.pieces if piece.name == 'Rook' and not piece.has_moved]:
-            intersection = rook.legal_moves.intersection(castle_positions)
-            if intersection:
-                castle_target = intersection.pop()
-                if self.board.get(*castle_target) is None:
-                    c_x, c_y = castle_target
-                    castle_moves.add(self.positionRelative(((c_x - self.x) * 2, (c_y - self.y) * 2)))
+        for rook in self.player.castling_rights:
+            if rook.y != self.y or abs(rook.x - self.x) < 3:
+                continue
+
+            side = 1 if rook.x > self.x else -1
+            if any(self.board.get(x, self.y) is not None for x in range(self.x + side, rook.x, side)):
+                continue
+
+            # The king can't castle through, or in to, check.
+            passing, target = (self.x + side, self.y), (self.x + side * 2, self.y)
+            if not self.is_attacked(passing) and not self.is_attacked(target):
+                castle_moves.add(target)
 
         return castle_moves
 
+    def is_attacked(self, position):
+        '''
+        Returns True if any opponent piece threatens position.
+        '''
+        return position in self.player.threats
+
     @property
     def threatened_by(self):
-        threatened_by = []
-        for opponent in self.player.opponents:
-            for piece in opponent.pieces:
-                if self.position in piece.threatens:
-                    threatened_by.append(piece)
-        return threatened_by
+        return list(self.player.threats.get(self.position, ()))
 
     @property
     def in_check(self):
-        return bool(self.threatened_by)
+        return self.is_attacked(self.position)
 
     @property
     def defensive_moves(self):
@@ -176,6 +192,13 @@ class King(Piece):
 
         return defensive_moves
 
+    @property
+    def constraints(self):
+        '''
+        The defensive moves and blocked directions that constrain allied pieces.
+        '''
+        return self.defensive_moves, self.blocked_directions
+
     @property
     def blocked_directions(self):
         '''
@@ -207,18 +230,30 @@ class King(Piece):
         return blocked_directions
 
     def move(self, x, y):
-        if (x, y) in self.castles:
-            rook = next(piece for piece in self.player.pieces
-                        if piece.name == 'Rook' and not piece.has_moved and (x, y) in piece.legal_moves)
-            rook.move(*next(castle_position for castle_position in rook.legal_moves if castle_position in [self.positionRelative(position) for position in CARDINAL_DIRECTIONS]))
+        if y == self.y and abs(x - self.x) == 2:  # Only castling moves the king two spaces.
+            if (x, y) not in self.legal_moves:
+                return False
+
+            side = 1 if x > self.x else -1
+            rook = min((rook for rook in self.player.castling_rights
+                        if rook.y == self.y and (rook.x - self.x) * side > 0),
+                       key=lambda rook: abs(rook.x - self.x))
+            self.board.blank(*rook.position)
+            rook._x = self.x + side
+            self.board.set(*rook.position, rook)
+            rook.has_moved = True
 
             self.board.blank(*self.position)
             self._x, self._y = (x, y)
             self.board.set(x, y, self)
             self.has_moved = True
+            self.player.castling_rights.clear()
             return True
         else:
-            return super().move(x, y)
+            moved = super().move(x, y)
+            if moved:
+                self.player.castling_rights.clear()
+            return moved
 
 
 class Knight(DefensivePiece):
@@ -234,6 +269,20 @@ class Rook(DefensivePiece):
     symbol = '♜'
     move_directions = CARDINAL_DIRECTIONS
 
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.player.castling_rights.add(self)
+
+    def move(self, *args):
+        moved = super().move(*args)
+        if moved:
+            self.player.castling_rights.discard(self)
+        return moved
+
+    def kill(self):
+        super().kill()
+        self.player.castling_rights.discard(self)
+
 
 class Bishop(DefensivePiece):
     name = 'Bishop'
@@ -247,3 +296,31 @@ class Queen(DefensivePiece):
     value = 9
     symbol = '♛'
     move_directions = ALL_DIRECTIONS
+
+
+def back_rank(width):
+    '''
+    Returns the classes of the pieces along a back rank of width files, with Rooks in the
+    corners, the Queen and King in the middle, and Bishops and Knights alternating between.
+    '''
+    king = width // 2
+    rank = []
+    for x in range(width):
+        if x in (0, width - 1):
+            rank.append(Rook)
+        elif x == king:
+            rank.append(King)
+        elif x == king - 1:
+            rank.append(Queen)
+        else:
+            rank.append(Bishop if (king - 1 - x if x < king else x - king) % 2 else Knight)
+    return rank
+
+
+def set_up_pieces(board, player):
+    row = player.direction // 2
+    for n in range(len(board)):
+        Pawn(board, player, n, row + player.direction)
+
+    for x, piece in enumerate(back_rank(len(board))):
+        piece(board, player, x, row)
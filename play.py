@@ -1,83 +1,45 @@
-from chess import Chessboard, Player
+from chess import Chessboard, Game
 from console import print_board, LETTERS
+from players import HumanPlayer, RandomPlayer, MCTSPlayer, EnginePlayer
 import pieces
 import re
-from random import choice
 import sys
 
 
-class HumanPlayer(Player):
-    def play_turn(self):
-        move = input('{} player enter move:\n'.format(current_player)).lower()
-        return move
-
-
-class RandomPlayer(Player):
-    def play_turn(self):
-        possible_moves = []
-        for piece in self.pieces:
-            for move in piece.legal_moves:
-                possible_moves.append((piece.position, move))
-
-        selected_piece, target = choice(possible_moves)
-        move = '{}{} to {}{}'.format(LETTERS[selected_piece[0]], selected_piece[1] + 1, LETTERS[target[0]], target[1] + 1)
-
-        return move
-
-
 chessboard = Chessboard()
 white = RandomPlayer('White', 1) if 'cpu' in sys.argv else HumanPlayer('White', 1)
-black = RandomPlayer('Black', -1)
-
-
-def set_up_pieces(board, player):
-    row = player.direction // 2
-    for n in range(len(board)):
-        pieces.Pawn(board, player, n, row + player.direction)
-
-    pieces.Rook(board, player, 0, row)
-    pieces.Rook(board, player, 7, row)
-    pieces.Knight(board, player, 1, row)
-    pieces.Knight(board, player, 6, row)
-    pieces.Bishop(board, player, 2, row)
-    pieces.Bishop(board, player, 5, row)
-    pieces.Queen(board, player, 3, row)
-    pieces.King(board, player, 4, row)
+if 'mcts' in sys.argv:
+    black = MCTSPlayer('Black', -1)
+elif 'engine' in sys.argv:
+    black = EnginePlayer('Black', -1)
+else:
+    black = RandomPlayer('Black', -1)
 
 
 def draw():
     print_board(chessboard, scale='positions')
     print('Score: {}-{}'.format(white.score, black.score))
+    for player in [white, black]:
+        if isinstance(player, MCTSPlayer) and player.playouts:
+            print('{} MCTS: {} playouts, {:.0f} playouts/s'.format(player, player.playouts, player.playouts_per_second))
 
 
-set_up_pieces(chessboard, white)
-set_up_pieces(chessboard, black)
+pieces.set_up_pieces(chessboard, white)
+pieces.set_up_pieces(chessboard, black)
 
-current_player = white
+game = Game(chessboard)
 
-total_moves = 0
 move = ''
-while move != 'exit' and total_moves < 1000:
+while move != 'exit' and game.moves < 1000:
     draw()
-    move = current_player.play_turn()
+    move = game.current_player.play_turn()
     if 'to' in move:
         instructions = [i.strip() for i in move.lower().split('to')]
         if re.search('^[a-z][1-9]$', instructions[0]) and re.search('^[a-z][1-9]$', instructions[1]):
-            piece = chessboard.get(LETTERS.lower().index(instructions[0][0]), int(instructions[0][1]) - 1)
+            start = (LETTERS.lower().index(instructions[0][0]), int(instructions[0][1]) - 1)
             target = (LETTERS.lower().index(instructions[1][0]), int(instructions[1][1]) - 1)
 
-            if piece and piece.player == current_player:
-                if piece.move(*target):
-                    total_moves += 1
-                    current_player = black if current_player is white else white
-                    if not [piece for piece in current_player.pieces if piece.legal_moves]:
-                        draw()
-                        if current_player.king.in_check:
-                            print('Check mate, {} wins.'.format(black if current_player is white else white))
-                        else:
-                            print('Stalemate. Game draw!')
-                        move = 'exit'
-                    if len(black.pieces) == 1 and len(white.pieces) == 1:
-                        draw()
-                        print('Game draw!')
-                        move = 'exit'
+            if game.move(start, target) and game.result:
+                draw()
+                print(game.result)
+                move = 'exit'
@@ -0,0 +1,258 @@
+from chess import Player
+from evaluation import encode
+from console import LETTERS
+from search import analyse
+from structure import PawnTable
+from transposition import TranspositionTable
+from math import log, sqrt, tanh
+from random import Random, randrange
+from time import perf_counter
+
+
+def format_move(start, target):
+    return '{}{} to {}{}'.format(LETTERS[start[0]], start[1] + 1, LETTERS[target[0]], target[1] + 1)
+
+
+def parse_move(move):
+    '''
+    Returns the start and target positions of a move written by format_move.
+    '''
+    start, target = [position.strip() for position in move.lower().split('to')]
+    return (LETTERS.index(start[0]), int(start[1:]) - 1), (LETTERS.index(target[0]), int(target[1:]) - 1)
+
+
+class HumanPlayer(Player):
+    def play_turn(self):
+        move = input('{} player enter move:\n'.format(self)).lower()
+        return move
+
+
+class RandomPlayer(Player):
+    def play_turn(self):
+        # Reservoir sample a move uniformly in one pass, without listing every move.
+        selected = None
+        for count, (piece, target) in enumerate(self.iter_legal_moves(), 1):
+            if randrange(count) == 0:
+                selected = (piece.position, target)
+
+        return format_move(*selected)
+
+
+class EnginePlayer(Player):
+    '''
+    Plays the best move found by an alpha-beta search to depth plies, or by an earlier
+    search kept in an optional AnalysisCache, reporting to an optional Telemetry.
+    '''
+
+    def __init__(self, name, direction, depth=3, table_size_mb=16, cache=None, telemetry=None, players=None):
+        super().__init__(name, direction, players)
+        self.depth = depth
+        self.table = TranspositionTable(table_size_mb)
+        self.pawn_table = PawnTable()
+        self.cache = cache
+        self.telemetry = telemetry
+        self.nodes = 0
+
+    def play_turn(self):
+        score, move, self.nodes = analyse(self, self.depth, self.table, self.cache, telemetry=self.telemetry,
+                                          pawn_table=self.pawn_table)
+        if self.cache is not None:
+            self.cache.flush()
+
+        return format_move(*move)
+
+
+class Node:
+    '''
+    A position in the search tree, reached by move, played by the player at index mover.
+    '''
+    __slots__ = ['move', 'mover', 'parent', 'children', 'untried', 'visits', 'wins']
+
+    def __init__(self, move=None, mover=None, parent=None):
+        self.move = move
+        self.mover = mover
+        self.parent = parent
+        self.children = {}
+        self.untried = None  # Moves not yet expanded, generated on the first visit.
+        self.visits = 0
+        self.wins = 0.0
+
+    def best_child(self, exploration):
+        log_visits = log(self.visits)
+        return max(self.children.values(),
+                   key=lambda child: child.wins / child.visits + exploration * sqrt(log_visits / child.visits))
+
+
+class MCTSPlayer(Player):
+    '''
+    Plays the move found by Monte Carlo Tree Search (UCT) within time_limit seconds.
+
+    Playouts pick a random piece and then one of its moves, preferring captures, so
+    most plies only generate the moves of a single piece. Playouts that last longer
+    than playout_depth plies are scored on material. The tree below the move played
+    is kept for the next turn.
+
+    Given an EvaluationService, leaves are scored by its model instead of played out,
+    selecting a batch of leaves at a time. Each visit is counted as it is selected, as
+    a virtual loss, so that the rest of the batch explores other moves.
+    '''
+
+    def __init__(self, name, direction, time_limit=1.0, exploration=1.4, playout_depth=60, seed=None,
+                 evaluator=None, players=None):
+        super().__init__(name, direction, players)
+        self.time_limit = time_limit
+        self.evaluator = evaluator
+        self.exploration = exploration
+        self.playout_depth = playout_depth
+        self.random = Random(seed)
+        self.playouts = 0
+        self.playouts_per_second = 0.0
+        self._tree = None
+        self._tree_position = None
+
+    def play_turn(self):
+        board = self.board
+        players = self.players
+        root = self.reuse_tree(board, players)
+
+        start = perf_counter()
+        playouts = 0
+        while not playouts or perf_counter() - start < self.time_limit:
+            if self.evaluator is None:
+                self.playout(root, *board.snapshot(players), players.index(self))
+                playouts += 1
+            else:
+                playouts += self.evaluate_leaves(root, board, players, players.index(self))
+        self.playouts = playouts
+        self.playouts_per_second = playouts / (perf_counter() - start)
+
+        if not root.children:
+            return ''
+
+        best = max(root.children.values(), key=lambda child: child.visits)
+        board, snapshot_players = board.snapshot(players)
+        self.apply(board, best.move)
+        best.parent = None
+        self._tree, self._tree_position = best, (board, snapshot_players)
+
+        return format_move(*best.move)
+
+    def reuse_tree(self, board, players):
+        '''
+        Returns the node of the kept tree matching the position, or a new root.
+        '''
+        if self._tree is not None:
+            position = self.position(board, players)
+            for child in self._tree.children.values():
+                tree_board, tree_players = self._tree_position[0].snapshot(self._tree_position[1])
+                self.apply(tree_board, child.move)
+                if self.position(tree_board, tree_players) == position:
+                    child.parent = None
+                    return child
+
+        return Node(mover=(players.index(self) - 1) % len(players))
+
+    @staticmethod
+    def position(board, players):
+        return frozenset((piece.position, piece.name, index, piece.has_moved)
+                         for index, player in enumerate(players) for piece in player.pieces)
+
+    @staticmethod
+    def apply(board, move):
+        start, target = move
+        board.get(*start).move(*target)
+
+    def playout(self, node, board, players, turn):
+        node, turn = self.select(node, board, players, turn)
+        self.backpropagate(node, self.rollout(players, turn))
+
+    def select(self, node, board, players, turn):
+        '''
+        Follows the best children down the tree and expands a new one, playing their moves
+        on board. Returns the leaf reached and the turn there.
+        '''
+        # Selection
+        while node.untried == [] and node.children:
+            node = node.best_child(self.exploration)
+            self.apply(board, node.move)
+            turn += 1
+
+        # Expansion
+        if node.untried is None:
+            node.untried = [(piece.position, move) for piece, move in players[turn % len(players)].iter_legal_moves()]
+            self.random.shuffle(node.untried)
+        if node.untried:
+            move = node.untried.pop()
+            child = Node(move, turn % len(players), node)
+            node.children[move] = child
+            node = child
+            self.apply(board, move)
+            turn += 1
+
+        return node, turn
+
+    @staticmethod
+    def backpropagate(node, rewards, visit=True):
+        while node is not None:
+            if visit:
+                node.visits += 1
+            if rewards and node.mover is not None:
+                node.wins += rewards[node.mover]
+            node = node.parent
+
+    def evaluate_leaves(self, root, board, players, turn):
+        '''
+        Selects a batch of leaves and scores them together with the evaluator. Returns the
+        number of leaves.
+        '''
+        leaves = []
+        for n in range(self.evaluator.max_batch_size):
+            leaf_board, leaf_players = board.snapshot(players)
+            node, leaf_turn = self.select(root, leaf_board, leaf_players, turn)
+            self.backpropagate(node, None)  # Count the visit now, as a virtual loss
+            to_move = leaf_turn % len(leaf_players)
+            if next(leaf_players[to_move].iter_legal_moves(), None) is None:  # Score the end of the game
+                leaves.append((node, to_move, None, self.rollout(leaf_players, leaf_turn)))
+            else:
+                leaves.append((node, to_move, self.evaluator.submit(encode(leaf_players[to_move])), None))
+
+        for node, to_move, future, rewards in leaves:
+            if future is not None:
+                value = 0.5 + 0.5 * tanh(future.result() / 1000)
+                rewards = [value if index == to_move else 1 - value for index in range(len(players))]
+            self.backpropagate(node, rewards, visit=False)
+        return len(leaves)
+
+    def rollout(self, players, turn):
+        '''
+        Plays random moves to the end of the game, returning a reward for each player.
+        '''
+        for ply in range(self.playout_depth):
+            player = players[turn % len(players)]
+            move = self.rollout_move(player)
+            if move is None:
+                if player.king and player.king.in_check:  # Check mate
+                    return [0.0 if other is player else 1.0 for other in players]
+                return [0.5] * len(players)  # Stalemate
+            if all(len(other.pieces) == 1 for other in players):
+                return [0.5] * len(players)
+
+            piece, target = move
+            piece.move(*target)
+            turn += 1
+
+        material = [sum(piece.value for piece in player.pieces if piece is not player.king) for player in players]
+        total = sum(material)
+        return [0.5 + 0.5 * tanh((own - (total - own) / max(len(players) - 1, 1)) / 10) for own in material]
+
+    def rollout_move(self, player):
+        '''
+        Picks a random piece with legal moves, and one of its moves, preferring captures.
+        '''
+        pieces = list(player.pieces)
+        self.random.shuffle(pieces)
+        for piece in pieces:
+            moves = list(piece.legal_moves)
+            if moves:
+                captures = [move for move in moves if piece.board.get(*move)]
+                return piece, self.random.choice(captures or moves)
@@ -0,0 +1,483 @@
+'''
+Frozen copy of the Chessboard, Player and Piece classes, kept as a reference for the
+fuzz tester to compare faster move generation against. Don't optimise this module.
+'''
+from sys import maxsize
+
+
+class Chessboard:
+    def __init__(self):
+        self._board = [[None] * 8 for n in range(8)]
+
+    def __str__(self):
+        return '{}x{} Chessboard'.format(len(self._board), len(self._board[0]))
+
+    def __getitem__(self, key):
+        return self._board[key]
+
+    def __len__(self):
+        return len(self._board)
+
+    def get(self, x, y):
+        if x >= 0 and y >= 0:
+            try:
+                return self._board[x][y]
+            except IndexError:
+                return False
+        else:
+            return False
+
+    def set(self, x, y, value):
+        self._board[x][y] = value
+
+    def blank(self, x, y):
+        self._board[x][y] = None
+
+
+class Player:
+    players = []
+
+    def __init__(self, name, direction):
+        self.name = name
+        self.pieces = []
+        self.direction = direction
+        self.score = 0
+        self.king = False
+        self.castling_rights = set()  # Rooks that have not moved, and so may still castle with the king.
+        self.players.append(self)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def opponents(self):
+        return [player for player in self.players if player is not self]
+
+
+class Piece:
+    '''
+    Class to represent chess piece.
+    '''
+    value = 0
+    name = 'Piece'
+    symbol = '  '
+    moves = []
+    move_directions = []
+
+    def __init__(self, board, player, x, y):
+        self.board = board
+        self._x = (len(self.board) + x) % len(self.board)
+        self._y = (len(self.board[0]) + y) % len(self.board[0])
+        self.player = player
+        player.pieces.append(self)
+        board.set(x, y, self)
+        self.has_moved = False
+
+    def __str__(self):
+        return '{} {} @ {}, {}'.format(self.player, self.name, *self.position)
+
+    def __repr__(self):
+        return '{}({}, {}, {}, {})'.format(self.name, self.board, self.player, *self.position)
+
+    @property
+    def legal_moves(self):
+        '''
+        Returns a list of tuples for legal moves.
+        '''
+        return {position for position in self.threatens
+                if self.board.get(*position) is None or
+                self.board.get(*position).player is not self.player}
+
+    @property
+    def threatens(self):
+        threatens = set()
+
+        for position in self.moves:
+            target = self.positionRelative(position)
+            target_piece = self.board.get(*target)
+            if target_piece is not False:
+                threatens.add(target)
+
+        for direction in self.move_directions:
+            target = self.positionRelative(direction)
+            target_piece = self.board.get(*target)
+            while target_piece is None:
+                threatens.add(target)
+                target = self.advancePosition(target, direction)
+                target_piece = self.board.get(*target)
+            else:
+                if target_piece:
+                    threatens.add(target)
+
+        return threatens
+
+    def attacks(self, position):
+        '''
+        Returns True if the piece threatens position, without building the whole threatens set.
+        '''
+        if self.board.get(*position) is False:
+            return False
+
+        for move in self.moves:
+            if self.positionRelative(move) == position:
+                return True
+
+        if self.move_directions:
+            d_x, d_y = position[0] - self.x, position[1] - self.y
+            if (d_x or d_y) and (d_x == 0 or d_y == 0 or abs(d_x) == abs(d_y)):
+                step = (max(min(d_x, 1), -1), max(min(d_y, 1), -1) * self.player.direction)
+                if step in self.move_directions:
+                    target = self.positionRelative(step)
+                    while target != position:
+                        if self.board.get(*target) is not None:
+                            return False
+                        target = self.advancePosition(target, step)
+                    return True
+
+        return False
+
+    @property
+    def x(self):
+        return self._x
+
+    @property
+    def y(self):
+        return self._y
+
+    @property
+    def position(self):
+        return (self._x, self._y)
+
+    def positionRelative(self, pos):
+        # Sets the target relative to the piece's current position.
+        x, y = pos
+        return (self.x + x, self.y + y * self.player.direction)
+
+    def advancePosition(self, old_pos, direction):
+        '''
+        Advances the target from its old position in the given direction,
+        relative to the player's facing.
+        '''
+        x, y = old_pos
+        ad_x, ad_y = direction
+        return (x + ad_x, y + ad_y * self.player.direction)
+
+    def move(self, x, y):
+        if (x, y) in self.legal_moves:
+            self.board.blank(*self.position)
+
+            if self.board.get(x, y):
+                self.player.score += self.board[x][y].value
+                self.board[x][y].kill()
+
+            self._x, self._y = (x, y)
+            self.board.set(x, y, self)
+            self.has_moved = True
+            return True
+        else:
+            return False
+
+    def kill(self):
+        self.player.pieces.remove(self)
+
+CARDINAL_DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+DIAGONAL_DIRECTIONS = [(1, 1), (-1, 1), (1, -1), (-1, -1)]
+ALL_DIRECTIONS = CARDINAL_DIRECTIONS + DIAGONAL_DIRECTIONS
+
+
+class DefensivePiece(Piece):
+    '''
+    A DefensivePiece will not leave or put a player's king in check.
+    '''
+
+    def defend_king(self, legal_moves):
+        '''
+        If the king is in check, or this piece is pinned, constrain its moves to those
+        that are legal to protect the king.
+        '''
+        if self.player.king:
+            if self.player.king.defensive_moves is not False:  # Constrain legal moves to any defensive moves required by a king in check
+                legal_moves.intersection_update(self.player.king.defensive_moves)
+
+            if self.player.king.blocked_directions:  # Constrain legal moves of pinned pieces to keep the king out of check
+                for blocked_line in self.player.king.blocked_directions:
+                    if self.position in blocked_line:
+                        legal_moves.intersection_update(blocked_line)
+
+        return legal_moves
+
+    @property
+    def legal_moves(self):
+        legal_moves = super().legal_moves
+
+        return self.defend_king(legal_moves)
+
+
+class Pawn(DefensivePiece):
+    '''
+    A Pawn can move forward one space, and attack diagonally in the forward direction.
+    On its fist move it may move two spaces.
+    '''
+    name = 'Pawn'
+    value = 1
+    symbol = '♟'
+
+    @property
+    def legal_moves(self):
+        legal_moves = set()
+
+        # Move forward one space, or two if not yet moved.
+        forward_one = self.positionRelative((0, 1))
+        if self.board.get(*forward_one) is None:
+            legal_moves.add(forward_one)
+            forward_two = self.positionRelative((0, 2))
+            if not self.has_moved and self.board.get(*forward_two) is None:
+                legal_moves.add(forward_two)
+
+        # Attack only in diagonals.
+        for position in [self.positionRelative((-1, 1)), self.positionRelative((1, 1))]:
+            piece = self.board.get(*position)
+            if piece and piece.player is not self.player:
+                legal_moves.add(position)
+
+        return self.defend_king(legal_moves)
+
+    @property
+    def threatens(self):
+        threatens = set()
+        for position in [self.positionRelative((-1, 1)), self.positionRelative((1, 1))]:
+            if self.board.get(*position) is not False:
+                threatens.add(position)
+
+        return threatens
+
+    def attacks(self, position):
+        return (position in (self.positionRelative((-1, 1)), self.positionRelative((1, 1))) and
+                self.board.get(*position) is not False)
+
+    def move(self, *args):
+        moved = super().move(*args)
+        if moved and self.y == (len(self.board[0]) - 1) + ((self.player.direction // 2) * (len(self.board[0]) - 1)):
+            self.kill()
+            Queen(self.board, self.player, *self.position)
+        return moved
+
+
+class King(Piece):
+    name = 'King'
+    value = maxsize - 39
+    symbol = '♚'
+    moves = ALL_DIRECTIONS
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.player.king = self
+
+    @property
+    def legal_moves(self):
+        legal_moves = super().legal_moves
+
+        legal_moves.update(self.castles)
+
+        # Remove legal moves that put the king in check.
+
+        for opponent in self.player.opponents:
+            for threats in [piece.threatens for piece in opponent.pieces]:
+                legal_moves.difference_update(threats)
+
+        if self.threatened_by:
+            blocked_by_self = set()
+            for attacker in self.threatened_by:
+                if attacker.move_directions:  # If the threat can be blocked
+                    direction = (attacker.x - self.player.king.x,
+                                 attacker.y - self.player.king.y)
+                    direction = (-max(min(direction[0], 1), -1), -max(min(direction[1], 1), -1) * self.player.direction)
+                    blocked_by_self.add(self.positionRelative(direction))
+
+            legal_moves.difference_update(blocked_by_self)
+
+        return legal_moves
+
+    @property
+    def castles(self):
+        '''
+        Returns target positions for possible castle moves.
+        '''
+        if self.has_moved or not self.player.castling_rights or self.is_attacked(self.position):
+            return set()
+
+        castle_moves = set()
+
+        for rook in self.player.castling_rights:
+            if rook.y != self.y or abs(rook.x - self.x) < 3:
+                continue
+
+            side = 1 if rook.x > self.x else -1
+            if any(self.board.get(x, self.y) is not None for x in range(self.x + side, rook.x, side)):
+                continue
+
+            # The king can't castle through, or in to, check.
+            passing, target = (self.x + side, self.y), (self.x + side * 2, self.y)
+            if not self.is_attacked(passing) and not self.is_attacked(target):
+                castle_moves.add(target)
+
+        return castle_moves
+
+    def is_attacked(self, position):
+        '''
+        Returns True if any opponent piece threatens position.
+        '''
+        return any(piece.attacks(position) for opponent in self.player.opponents for piece in opponent.pieces)
+
+    @property
+    def threatened_by(self):
+        threatened_by = []
+        for opponent in self.player.opponents:
+            for piece in opponent.pieces:
+                if piece.attacks(self.position):
+                    threatened_by.append(piece)
+        return threatened_by
+
+    @property
+    def in_check(self):
+        return self.is_attacked(self.position)
+
+    @property
+    def defensive_moves(self):
+        '''
+        A set of moves that are permissible to defend a king in check.
+        '''
+        threats = self.threatened_by
+        defensive_moves = False
+
+        if len(threats) > 1:  # If there is more than one threat to the king no pieces except the king can move.
+            return set()
+        elif len(threats) == 1:
+            attacker = threats[0]
+            defensive_moves = set()
+            defensive_moves.add(attacker.position)  # The attacker's position is a valid defensive move
+
+            if attacker.move_directions:  # If the threat can be blocked
+                direction = (attacker.x - self.player.king.x,
+                             attacker.y - self.player.king.y)
+                direction = (max(min(direction[0], 1), -1), max(min(direction[1], 1), -1) * self.player.direction)
+
+                position = self.player.king.positionRelative(direction)
+                while self.board.get(*position) is None:
+                    defensive_moves.add(position)
+                    position = self.player.king.advancePosition(position, direction)
+
+        return defensive_moves
+
+    @property
+    def blocked_directions(self):
+        '''
+        Returns list of sets of positions that can be safely occupied by pinned allied pieces.
+        '''
+        blocked_directions = []
+
+        for direction in ALL_DIRECTIONS:
+            blocking_positions = set()
+            target = self.positionRelative(direction)
+            target_piece = self.board.get(*target)
+            blocker = False
+            attacker = False
+            while target_piece is not False:
+                blocking_positions.add(target)
+                if target_piece:
+                    if not blocker and target_piece.player is self.player:
+                        blocker = target_piece
+                    elif blocker and target_piece.player is not self.player:
+                        attacker = target_piece
+                        if direction in attacker.move_directions:
+                            blocked_directions.append(blocking_positions)
+                        break
+                    else:
+                        break
+                target = self.advancePosition(target, direction)
+                target_piece = self.board.get(*target)
+
+        return blocked_directions
+
+    def move(self, x, y):
+        if y == self.y and abs(x - self.x) == 2:  # Only castling moves the king two spaces.
+            if (x, y) not in self.legal_moves:
+                return False
+
+            side = 1 if x > self.x else -1
+            rook = min((rook for rook in self.player.castling_rights
+                        if rook.y == self.y and (rook.x - self.x) * side > 0),
+                       key=lambda rook: abs(rook.x - self.x))
+            self.board.blank(*rook.position)
+            rook._x = self.x + side
+            self.board.set(*rook.position, rook)
+            rook.has_moved = True
+
+            self.board.blank(*self.position)
+            self._x, self._y = (x, y)
+            self.board.set(x, y, self)
+            self.has_moved = True
+            self.player.castling_rights.clear()
+            return True
+        else:
+            moved = super().move(x, y)
+            if moved:
+                self.player.castling_rights.clear()
+            return moved
+
+
+class Knight(DefensivePiece):
+    name = 'Knight'
+    value = 3
+    symbol = '♞'
+    moves = [(1, 2), (-1, 2), (2, 1), (2, -1), (-2, 1), (-2, -1), (-1, -2), (1, -2)]
+
+
+class Rook(DefensivePiece):
+    name = 'Rook'  # Castle
+    value = 5
+    symbol = '♜'
+    move_directions = CARDINAL_DIRECTIONS
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.player.castling_rights.add(self)
+
+    def move(self, *args):
+        moved = super().move(*args)
+        if moved:
+            self.player.castling_rights.discard(self)
+        return moved
+
+    def kill(self):
+        super().kill()
+        self.player.castling_rights.discard(self)
+
+
+class Bishop(DefensivePiece):
+    name = 'Bishop'
+    value = 3
+    symbol = '♝'
+    move_directions = DIAGONAL_DIRECTIONS
+
+
+class Queen(DefensivePiece):
+    name = 'Queen'
+    value = 9
+    symbol = '♛'
+    move_directions = ALL_DIRECTIONS
+
+
+def set_up_pieces(board, player):
+    row = player.direction // 2
+    for n in range(len(board)):
+        Pawn(board, player, n, row + player.direction)
+
+    Rook(board, player, 0, row)
+    Rook(board, player, 7, row)
+    Knight(board, player, 1, row)
+    Knight(board, player, 6, row)
+    Bishop(board, player, 2, row)
+    Bishop(board, player, 5, row)
+    Queen(board, player, 3, row)
+    King(board, player, 4, row)
@@ -0,0 +1,322 @@
+'''
+Alpha-beta search over positions of a game, played out on Chessboard snapshots.
+
+Move ordering and pruning can each be switched off to measure what they save:
+MVV-LVA capture ordering, killer moves, the history heuristic, null-move pruning,
+late move reductions, and the quiescence search at the end of the main search along
+with its pruning of losing captures by static exchange evaluation. An optional
+TranspositionTable supplies best moves to try first and cuts off positions already
+searched deeply enough, keyed by the canonical form of positions. An optional Telemetry
+reports each iteration of the search, and an optional EvaluationService scores positions
+in place of evaluate.
+
+Positions are scored in centipawns, on material and pawn structure, with pawn structure
+scores kept in a PawnTable and added to the score of evaluate or the EvaluationService.
+'''
+from collections import defaultdict
+from time import perf_counter
+
+from canonical import canonical_key, transform_move
+from exchange import promotes, static_exchange
+from fen import coordinates
+from structure import PawnTable
+from transposition import EXACT, LOWER, UPPER
+
+CENTIPAWNS = 100
+MATE = 100000
+NULL_MOVE_REDUCTION = 2
+KING_ORDER_VALUE = 20  # The King's real value would always sort its captures last
+FEATURES = ['mvv_lva', 'killers', 'history', 'null_move', 'late_move_reductions', 'quiescence', 'exchange_pruning']
+
+
+def material(player):
+    return sum(piece.value for piece in player.pieces if piece is not player.king)
+
+
+def evaluate(player):
+    '''
+    Scores the position for player on material, in centipawns.
+    '''
+    return (material(player) - sum(material(opponent) for opponent in player.opponents)) * CENTIPAWNS
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def is_legal(player, move):
+    start, target = move
+    piece = player.pieces[0].board.get(*start)
+    return bool(piece) and piece.player is player and target in piece.legal_moves
+
+
+def analyse(player, depth, table=None, cache=None, time_limit=None, telemetry=None, pawn_table=None):
+    '''
+    Returns the score, best move and nodes searched for the position of player's game,
+    using an AnalysisCache entry at least depth deep if there is one, or else searching
+    and adding the result to the cache.
+    '''
+    board = player.pieces[0].board
+    key, transform = canonical_key(player)
+    if cache is not None:
+        cached = cache.get(key, depth)
+        move = cached and transform_move(board, cached.move, transform)
+        if cached and (move is None or is_legal(player, move)):
+            if telemetry is not None:
+                telemetry.emit('analysis', depth=cached.depth, score=cached.score, move=coordinates(move),
+                               nodes=0, cached=True, cache_hit_rate=cache.stats['hit_rate'])
+            return cached.score, move, 0
+
+    search = Search(table, telemetry, pawn_table=pawn_table)
+    score, move = search.search(player, depth, time_limit)
+    if cache is not None:
+        cache.put(key, search.depth, score, transform_move(board, move, transform))
+    if telemetry is not None:
+        telemetry.emit('analysis', depth=search.depth, score=score, move=coordinates(move), nodes=search.nodes,
+                       cached=False, cache_hit_rate=cache.stats['hit_rate'] if cache is not None else None)
+    return score, move, search.nodes
+
+
+def to_table(score, ply):
+    # Store mate scores relative to the position, rather than the root of the search.
+    if score > MATE - 1000:
+        return score + ply
+    elif score < -MATE + 1000:
+        return score - ply
+    return score
+
+
+def from_table(score, ply):
+    if score > MATE - 1000:
+        return score - ply
+    elif score < -MATE + 1000:
+        return score + ply
+    return score
+
+
+class Search:
+    def __init__(self, table=None, telemetry=None, evaluator=None, pawn_table=None, mvv_lva=True, killers=True, history=True, null_move=True,
+                 late_move_reductions=True, quiescence=True, exchange_pruning=True):
+        self.table = table
+        self.telemetry = telemetry
+        self.evaluator = evaluator
+        self.pawn_table = PawnTable() if pawn_table is None else pawn_table
+        self.mvv_lva = mvv_lva
+        self.killers = killers
+        self.history = history
+        self.null_move = null_move
+        self.late_move_reductions = late_move_reductions
+        self.quiescence = quiescence
+        self.exchange_pruning = exchange_pruning
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = None
+        self.best_move = None
+        self.killer_moves = defaultdict(list)
+        self.history_scores = defaultdict(int)
+
+    def search(self, player, depth, time_limit=None):
+        '''
+        Searches the position of player's game, with player to move, deepening one ply
+        at a time up to depth, or until time_limit seconds have passed. Returns the score
+        for player and the best move of the deepest search completed.
+        '''
+        turn = player.players.index(player)
+        board, players = player.pieces[0].board.snapshot(player.players)
+
+        score, best_move = 0, None
+        start = perf_counter()
+        self.deadline = start + time_limit if time_limit else None
+        iteration_nodes = []
+        for iteration in range(1, depth + 1):
+            try:
+                score = self.alphabeta(board, players, turn, iteration, -MATE - 1, MATE + 1, 0)
+            except SearchTimeout:
+                break
+            best_move, self.depth = self.best_move, iteration
+            if self.telemetry is not None:
+                iteration_nodes.append(self.nodes - sum(iteration_nodes))
+                self.report(board, players, turn, score, start, iteration_nodes)
+            if self.deadline and perf_counter() > self.deadline:
+                break
+        self.best_move = best_move
+        return score, best_move
+
+    def report(self, board, players, turn, score, start, iteration_nodes):
+        '''
+        Emits telemetry for the iteration just completed. The effective branching factor
+        is the ratio of the nodes it took to those the iteration before took.
+        '''
+        seconds = perf_counter() - start
+        self.telemetry.emit(
+            'iteration', depth=self.depth, score=score, nodes=self.nodes, seconds=seconds,
+            nps=self.nodes / seconds if seconds else None,
+            ebf=iteration_nodes[-1] / iteration_nodes[-2] if len(iteration_nodes) > 1 else None,
+            pv=[coordinates(move) for move in self.principal_variation(board, players, turn)],
+            table_hit_rate=self.table.stats['hit_rate'] if self.table is not None else None,
+            pawn_hit_rate=self.pawn_table.stats['hit_rate'])
+
+    def principal_variation(self, board, players, turn):
+        '''
+        Returns the best move followed by the best replies stored in the transposition table.
+        '''
+        variation = [self.best_move] if self.best_move else []
+        board, players = board.snapshot(players)
+        move = self.best_move
+        while move and len(variation) < self.depth:
+            board.get(*move[0]).move(*move[1])
+            turn = (turn + 1) % len(players)
+            if self.table is None:
+                break
+            key, transform = canonical_key(players[turn])
+            entry = self.table.peek(key)
+            move = entry and transform_move(board, entry.move, transform)
+            if not move or not is_legal(players[turn], move):
+                break
+            variation.append(move)
+        return variation
+
+    def evaluate(self, board, players, turn, alpha, beta, ply):
+        '''
+        Scores positions at the end of the search.
+        '''
+        if self.quiescence:
+            return self.quiesce(board, players, turn, alpha, beta, ply)
+        return self.static_evaluation(players[turn])
+
+    def static_evaluation(self, player):
+        score = evaluate(player) if self.evaluator is None else self.evaluator.evaluate(player)
+        return score + self.pawn_table.score(player)
+
+    def quiesce(self, board, players, turn, alpha, beta, ply):
+        '''
+        Searches only captures and promotions until the position is quiet, so it isn't
+        scored in the middle of an exchange. The player to move may stand pat instead.
+        '''
+        player = players[turn]
+        score = self.static_evaluation(player)
+        if score >= beta:
+            return score
+        alpha = max(alpha, score)
+
+        moves = []
+        for piece, target in player.iter_legal_moves():
+            if board.get(*target) or promotes(piece, target):
+                move = (piece.position, target)
+                if not self.exchange_pruning or static_exchange(board, move) >= 0:
+                    moves.append(move)
+
+        for move in sorted(moves, key=lambda move: self.capture_order(board, move), reverse=True):
+            self.nodes += 1
+            child_board, child_players = board.snapshot(players)
+            child_board.get(*move[0]).move(*move[1])
+            score = -self.quiesce(child_board, child_players, (turn + 1) % len(players), -beta, -alpha, ply + 1)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+
+        return alpha
+
+    def alphabeta(self, board, players, turn, depth, alpha, beta, ply, null_allowed=True):
+        self.nodes += 1
+        if self.deadline and self.depth and not self.nodes % 256 and perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if depth <= 0:
+            return self.evaluate(board, players, turn, alpha, beta, ply)
+
+        player = players[turn]
+        next_turn = (turn + 1) % len(players)
+
+        key, table_move = None, None
+        if self.table is not None:
+            key, transform = canonical_key(player)
+            entry = self.table.probe(key)
+            if entry:
+                table_move = transform_move(board, entry.move, transform)
+                if ply and entry.depth >= depth:
+                    score = from_table(entry.score, ply)
+                    if entry.bound == EXACT:
+                        return score
+                    elif entry.bound == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+
+        moves = [(piece.position, target) for piece, target in player.iter_legal_moves()]
+        in_check = bool(player.king) and player.king.in_check
+        if not moves:
+            return -MATE + ply if in_check else 0
+        if all(len(each_player.pieces) == 1 for each_player in players):
+            return 0
+
+        # Pass the move, and if the opponent still can't reach beta it's safe to cut off.
+        if (self.null_move and null_allowed and ply and depth >= 3 and not in_check and
+                any(piece.name not in ['Pawn', 'King'] for piece in player.pieces)):
+            score = -self.alphabeta(board, players, next_turn, depth - 1 - NULL_MOVE_REDUCTION,
+                                    -beta, -beta + 1, ply + 1, False)
+            if score >= beta:
+                return beta
+
+        original_alpha = alpha
+        best_score, best_move = -MATE - 1, None
+        for index, move in enumerate(self.order(board, moves, table_move, ply)):
+            capture = board.get(*move[1]) is not None
+            child_board, child_players = board.snapshot(players)
+            child_board.get(*move[0]).move(*move[1])
+
+            # Search late quiet moves less deeply, searching again if one turns out well.
+            if (self.late_move_reductions and index >= 3 and depth >= 3 and not capture and not in_check and
+                    move not in self.killer_moves[ply]):
+                score = -self.alphabeta(child_board, child_players, next_turn, depth - 2, -alpha - 1, -alpha, ply + 1)
+                if score > alpha:
+                    score = -self.alphabeta(child_board, child_players, next_turn, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self.alphabeta(child_board, child_players, next_turn, depth - 1, -beta, -alpha, ply + 1)
+
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                if not capture:
+                    self.record_cutoff(move, depth, ply)
+                break
+
+        if key is not None:
+            bound = UPPER if best_score <= original_alpha else LOWER if best_score >= beta else EXACT
+            self.table.store(key, depth, bound, to_table(best_score, ply), transform_move(board, best_move, transform))
+        if not ply:
+            self.best_move = best_move
+        return best_score
+
+    def order(self, board, moves, table_move, ply):
+        '''
+        Sorts moves to search those most likely to cause a cut off first.
+        '''
+        killer_moves = self.killer_moves[ply] if self.killers else []
+
+        def priority(move):
+            if move == table_move:
+                return (3, 0)
+            if self.mvv_lva and board.get(*move[1]):
+                return (2, self.capture_order(board, move))
+            if move in killer_moves:
+                return (1, 0)
+            return (0, self.history_scores[move] if self.history else 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    @staticmethod
+    def capture_order(board, move):
+        '''
+        Most valuable victim, least valuable attacker.
+        '''
+        attacker, victim = board.get(*move[0]), board.get(*move[1])
+        return (victim.value if victim else 0) * 100 - min(attacker.value, KING_ORDER_VALUE)
+
+    def record_cutoff(self, move, depth, ply):
+        if self.killers and move not in self.killer_moves[ply]:
+            self.killer_moves[ply] = [move] + self.killer_moves[ply][:1]
+        if self.history:
+            self.history_scores[move] += depth * depth
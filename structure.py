@@ -0,0 +1,81 @@
+'''
+Pawn structure evaluation, in centipawns, with a table of results keyed by the board's
+pawn_key, since the Pawns change far less often than the rest of the position.
+
+Each player loses points for doubled Pawns, sharing a file with another of their own,
+and isolated Pawns, with none of their own on the files either side, and gains points
+for passed Pawns, with no opponent Pawn ahead of them on their own file or either side,
+more the further they have advanced. Players are told apart by their place in the order
+of play, as in the keys, since players may share a direction in games of more than two.
+'''
+DOUBLED_PAWN = 20
+ISOLATED_PAWN = 15
+PASSED_PAWN = 10  # For each rank advanced, and one more
+
+
+def structure_scores(board, players):
+    '''
+    Returns a dict of the pawn structure score of each player, by their place in players.
+    '''
+    files = [{} for player in players]
+    for index, player in enumerate(players):
+        for piece in player.pieces:
+            if piece.name == 'Pawn':
+                files[index].setdefault(piece.x, []).append(piece.y)
+
+    height = len(board[0])
+    scores = {}
+    for index, (player, own_files) in enumerate(zip(players, files)):
+        direction = player.direction
+        start = 1 if direction == 1 else height - 2
+        opponent_files = files[:index] + files[index + 1:]
+        score = 0
+        for x, ys in own_files.items():
+            score -= DOUBLED_PAWN * (len(ys) - 1)
+            if x - 1 not in own_files and x + 1 not in own_files:
+                score -= ISOLATED_PAWN * len(ys)
+            for y in ys:
+                if not any((other_y - y) * direction > 0 for other_files in opponent_files
+                           for file in (x - 1, x, x + 1) for other_y in other_files.get(file, ())):
+                    score += PASSED_PAWN * (1 + (y - start) * direction)
+        scores[index] = score
+    return scores
+
+
+class PawnTable:
+    '''
+    A small table of structure_scores keyed by pawn_key, replacing entries that share a slot.
+    '''
+
+    def __init__(self, size=4096):
+        self.keys = [None] * size
+        self.scores = [None] * size
+        self.probes = self.hits = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def score(self, player):
+        '''
+        The pawn structure score for player, less that of their opponents.
+        '''
+        board = player.pieces[0].board
+        key = board.pawn_key
+        slot = key % len(self.keys)
+        self.probes += 1
+        if self.keys[slot] == key:
+            self.hits += 1
+            scores = self.scores[slot]
+        else:
+            scores = structure_scores(board, player.players)
+            self.keys[slot], self.scores[slot] = key, scores
+        index = player.players.index(player)
+        return scores[index] - sum(score for other_index, score in scores.items() if other_index != index)
+
+    @property
+    def stats(self):
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+        }
@@ -0,0 +1,48 @@
+'''
+Streams events from searches as JSON lines, to a file or to a unix socket given as
+unix:/path/to/socket, so a long search can be watched as it goes.
+
+Searches report each iteration of their deepening once it completes, so nothing is
+done per node, and a search without telemetry only checks for it once per iteration.
+If the stream can't be written to, telemetry turns itself off rather than stop the search.
+'''
+import json
+import os
+import socket
+from time import time
+
+
+class Telemetry:
+    def __init__(self, target):
+        self.target = target
+        self.enabled = True
+        self._stream = None
+        self._pid = None
+
+    @property
+    def stream(self):
+        if self._pid != os.getpid():  # Each process opens its own stream
+            if self.target.startswith('unix:'):
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                connection.connect(self.target[len('unix:'):])
+                self._stream = connection.makefile('w')
+            else:
+                self._stream = open(self.target, 'a')
+            self._pid = os.getpid()
+        return self._stream
+
+    def emit(self, event, **fields):
+        if not self.enabled:
+            return
+        record = {'event': event, 'time': time(), 'pid': os.getpid()}
+        record.update(fields)
+        try:
+            self.stream.write(json.dumps(record) + '\n')
+            self.stream.flush()
+        except OSError:
+            self.enabled = False
+
+    def close(self):
+        if self._stream is not None and self._pid == os.getpid():
+            self._stream.close()
+        self._stream = self._pid = None
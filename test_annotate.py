@@ -0,0 +1,46 @@
+import io
+import unittest
+from multiprocessing import Pool
+import annotate
+import fen
+
+FOOLS_MATE = 'f2f3 e7e5 g2g4 d8h4'
+
+
+class AnnotateTestCase(unittest.TestCase):
+    def test_parses_games(self):
+        self.assertEqual(annotate.parse_game('e2e4, e7 to e5\n'), (fen.START, [((4, 1), (4, 3)), ((4, 6), (4, 4))]))
+        position = '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1'
+        self.assertEqual(annotate.parse_game(position + '; a1a8'), (position, [((0, 0), (0, 7))]))
+
+    def test_replays_games(self):
+        positions = list(annotate.replay(FOOLS_MATE))
+
+        self.assertEqual(len(positions), 5)
+        self.assertEqual(positions[0], (fen.START, ((5, 1), (5, 2))))
+        self.assertIsNone(positions[-1][1])
+        with self.assertRaises(ValueError):
+            list(annotate.replay('e2e5'))
+
+    def test_annotates_in_order(self):
+        lines = io.StringIO('{}\nbogus; e2e4\n\ne2e4 e7e5\n'.format(FOOLS_MATE))
+        with Pool(2, annotate.start_worker, (2, None, 1, None)) as pool:
+            annotations = list(annotate.annotations(lines, pool, window=2))
+
+        self.assertEqual([(annotation['game'], annotation.get('ply')) for annotation in annotations],
+                         [(0, 0), (0, 1), (0, 2), (0, 3), (1, None), (3, 0), (3, 1)])
+        self.assertEqual([annotation['move'] for annotation in annotations[:4]], FOOLS_MATE.split())
+        self.assertEqual([annotation['blunder'] for annotation in annotations[:4]], [False, False, True, False])
+        self.assertEqual(annotations[3]['best'], 'd8h4')
+        self.assertIn('error', annotations[4])
+
+    def test_writes_json_lines(self):
+        output = io.StringIO()
+        count, seconds = annotate.annotate_file(io.StringIO('e2e4\n'), output, depth=1, processes=1, log=None)
+
+        self.assertEqual(count, 1)
+        self.assertEqual(len(output.getvalue().splitlines()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from random import Random
+from chess import Chessboard, Player
+from pieces import King, Rook, Queen, Bishop, set_up_pieces
+try:
+    import numpy as np
+    import batch
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'batch move generation requires numpy')
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard()
+        Player.players = []
+        self.player1 = Player('White', 1)
+        self.player2 = Player('Black', -1)
+
+    def encode(self):
+        position, unmoved = batch.encode(self.chessboard)
+        return position[None], unmoved[None]
+
+    def test_starting_position(self):
+        set_up_pieces(self.chessboard, self.player1)
+        set_up_pieces(self.chessboard, self.player2)
+        positions, unmoved = self.encode()
+
+        masks, in_check, mobility = batch.legal_move_masks(np.concatenate([positions] * 2), [1, -1],
+                                                           np.concatenate([unmoved] * 2))
+
+        self.assertEqual(list(mobility), [20, 20])
+        self.assertFalse(in_check.any())
+        self.assertTrue(masks[0, 6, 0, 5, 2])  # Knight
+        self.assertTrue(masks[1, 4, 6, 4, 4])  # Pawn two spaces
+        self.assertTrue((batch.starting_squares(positions) == unmoved).all())
+
+    def test_pins_checks_and_castles_match_pieces(self):
+        King(self.chessboard, self.player1, 4, 0)
+        Rook(self.chessboard, self.player1, 0, 0)
+        Rook(self.chessboard, self.player1, 7, 0)
+        Bishop(self.chessboard, self.player1, 4, 1)
+        Queen(self.chessboard, self.player2, 4, 6)  # Pins the bishop
+        Bishop(self.chessboard, self.player2, 7, 2)  # Stops castling right through f1
+        King(self.chessboard, self.player2, 0, 7)
+        positions, unmoved = self.encode()
+
+        masks, in_check, mobility = batch.legal_move_masks(positions, [1], unmoved)
+
+        self.assertFalse(masks[0, 4, 1].any())
+        self.assertTrue(masks[0, 4, 0, 2, 0])
+        self.assertFalse(masks[0, 4, 0, 6, 0])
+        self.assertEqual(batch.differential(np.concatenate([positions] * 2), [1, -1], np.concatenate([unmoved] * 2)), [])
+        self.assertEqual(Player.players, [self.player1, self.player2])  # Decoding keeps its players to itself
+
+    def test_random_games_match_pieces(self):
+        random = Random(0)
+        positions, turn, unmoved = [], [], []
+        for game in range(3):
+            self.setUp()
+            set_up_pieces(self.chessboard, self.player1)
+            set_up_pieces(self.chessboard, self.player2)
+            player = self.player1
+            for ply in range(80):
+                position, unmoved_pieces = batch.encode(self.chessboard)
+                positions.append(position)
+                unmoved.append(unmoved_pieces)
+                turn.append(player.direction)
+                moves = [(piece, move) for piece in player.pieces for move in piece.legal_moves]
+                if not moves:
+                    break
+                piece, move = random.choice(moves)
+                piece.move(*move)
+                player = self.player2 if player is self.player1 else self.player1
+
+        self.assertEqual(batch.differential(positions, turn, unmoved), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
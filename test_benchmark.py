@@ -0,0 +1,38 @@
+import unittest
+import benchmark
+import fen
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_perft(self):
+        board, white, black, player = fen.load(fen.START)
+
+        self.assertEqual(benchmark.perft(board, player.players, 0, 1), 20)
+        self.assertEqual(benchmark.perft(board, player.players, 0, 2), 400)
+
+    def test_finds_regressions(self):
+        baseline = {'metrics': {'perft_nodes_per_second': 1000.0, 'castles_per_second': 100.0}}
+        results = {'metrics': {'perft_nodes_per_second': 850.0, 'castles_per_second': 95.0, 'new_per_second': 1.0}}
+
+        self.assertEqual(benchmark.regressions(results, baseline, 0.1), [('perft_nodes_per_second', 1000.0, 850.0)])
+        self.assertEqual(benchmark.regressions(results, baseline, 0.2), [])
+
+    def test_random_games_are_seeded(self):
+        moves, seconds = benchmark.random_game(3, plies=20)
+
+        self.assertEqual(len(moves), 20)
+        self.assertEqual(benchmark.random_game(3, plies=20)[0], moves)
+        self.assertNotEqual(benchmark.random_game(4, plies=20)[0], moves)
+        self.assertGreater(benchmark.bench_random_games(games=1, plies=10), 0)
+
+    def test_pad_position_keeps_the_moves(self):
+        board, white, black, player = fen.load(benchmark.pad_position(benchmark.POSITIONS[2], 12))
+
+        self.assertEqual((board.width, board.height), (12, 12))
+        self.assertEqual(white.castling_rights, {board.get(0, 0), board.get(11, 0)})
+        self.assertEqual(benchmark.pad_position(benchmark.POSITIONS[2], 8), benchmark.POSITIONS[2])
+        self.assertEqual(benchmark.perft(board, player.players, 0, 1), 74)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import unittest
+from multiprocessing import Pool
+from tempfile import TemporaryDirectory
+import fen
+from cache import AnalysisCache
+from search import analyse
+from canonical import canonical_key
+from players import EnginePlayer
+
+
+def read(arguments):
+    path, key = arguments
+    return AnalysisCache(path).get(key)
+
+
+class AnalysisCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'analysis.sqlite')
+        self.cache = AnalysisCache(self.path, batch_size=10)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_stores_analyses_in_batches(self):
+        for key in range(9):
+            self.cache.put(key, 2, key, ((0, 1), (0, 3)))
+
+        self.assertEqual(len(self.cache), 0)
+        self.cache.put(2 ** 64 - 1, 3, -40)  # Keys use all 64 bits
+
+        self.assertEqual(len(self.cache), 10)
+        self.assertEqual(self.cache.get(4), (2, 4, ((0, 1), (0, 3))))
+        self.assertEqual(self.cache.get(2 ** 64 - 1), (3, -40, None))
+        self.assertIsNone(self.cache.get(4, depth=3))
+        self.assertIsNone(self.cache.get(10))
+        self.assertEqual(self.cache.stats['hits'], 2)
+
+    def test_reads_analyses_waiting_to_be_written(self):
+        self.cache.put(1, 2, 10, ((0, 1), (0, 3)))
+        self.cache.put(1, 4, 20)
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.get(1), (4, 20, None))
+        self.assertEqual(self.cache.get(1, depth=3).score, 20)
+        self.assertIsNone(self.cache.get(1, depth=5))
+
+    def test_engine_player_writes_each_analysis(self):
+        board, white, black, player = fen.load('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1', (EnginePlayer, EnginePlayer))
+        player.depth, player.cache = 2, self.cache
+
+        move = player.play_turn()
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(player.play_turn(), move)
+        self.assertEqual(player.nodes, 0)
+        self.assertEqual(self.cache.stats['hit_rate'], 0.5)
+
+    def test_keeps_the_deepest_analysis(self):
+        self.cache.put_many([(1, 4, 10, None), (1, 2, 20, None)])
+        self.assertEqual(self.cache.get(1).score, 10)
+
+        self.cache.put_many([(1, 5, 30, None)])
+        self.assertEqual(self.cache.get(1).score, 30)
+
+    def test_persists_and_reads_from_other_processes(self):
+        self.cache.put_many([(key, 1, key, None) for key in range(100)])
+        self.cache.close()
+
+        with Pool(2) as pool:
+            results = pool.map(read, [(self.path, key) for key in range(0, 100, 10)])
+
+        self.assertEqual([result.score for result in results], list(range(0, 100, 10)))
+
+    def test_evicts_oldest_entries_when_full(self):
+        cache = AnalysisCache(self.path, max_mb=0.05, batch_size=100)
+        for key in range(5000):
+            cache.put(key, 1, 0)
+        cache.flush()
+
+        self.assertLessEqual(cache.size(), 0.05 * 2 ** 20)
+        self.assertIsNotNone(cache.get(4999))
+        self.assertIsNone(cache.get(0))
+        cache.close()
+
+    def test_analyse_uses_the_cache(self):
+        board, white, black, player = fen.load('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+
+        score, move, nodes = analyse(player, 2, cache=self.cache)
+        self.assertGreater(nodes, 0)
+        self.cache.flush()
+        self.assertEqual(self.cache.get(canonical_key(player)[0]).move, move)
+
+        self.assertEqual(analyse(player, 2, cache=self.cache), (score, move, 0))
+        self.assertGreater(analyse(player, 3, cache=self.cache)[2], 0)  # Not deep enough
+
+    def test_colour_flipped_positions_share_entries(self):
+        board, white, black, player = fen.load('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+        score, move, nodes = analyse(player, 2, cache=self.cache)
+        self.cache.flush()
+
+        board, white, black, player = fen.load('r5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1')
+        self.assertEqual(analyse(player, 2, cache=self.cache), (score, ((0, 7), (0, 0)), 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
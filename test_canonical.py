@@ -0,0 +1,69 @@
+import unittest
+import fen
+from canonical import canonical_key, transform_move, IDENTITY, Transform
+from chess import Chessboard, Player
+from pieces import King, Rook, Pawn
+from zobrist import position_key
+
+
+def key(position):
+    board, white, black, player = fen.load(position)
+    return canonical_key(player)
+
+
+class CanonicalTestCase(unittest.TestCase):
+    def test_colour_flip_shares_keys(self):
+        white_key, white_transform = key('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+        black_key, black_transform = key('r3k2r/pppbbppp/2n2q1P/1P2p3/3pn3/BN2PNP1/P1PPQPB1/R3K2R b KQkq - 0 1')
+
+        self.assertEqual(white_key, black_key)
+        self.assertEqual(white_transform, IDENTITY)
+        self.assertEqual(black_transform, Transform(True, False))
+
+    def test_side_to_move_and_castling_rights_change_keys(self):
+        e4 = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1'
+        self.assertNotEqual(key(e4)[0], key(e4.replace(' b ', ' w '))[0])
+        self.assertNotEqual(key(e4)[0], key(e4.replace('KQkq', 'Qkq'))[0])
+        self.assertEqual(key(fen.START)[0], key(fen.START.replace(' w ', ' b '))[0])  # The same with colours swapped
+
+    def test_mirrors_pawnless_positions_without_castling(self):
+        left = key('8/8/8/8/8/2k5/8/1K1R4 w - - 0 1')
+        right = key('8/8/8/8/8/5k2/8/4R1K1 w - - 0 1')
+
+        self.assertEqual(left[0], right[0])
+        self.assertNotEqual(left[1].mirror, right[1].mirror)
+        self.assertNotEqual(key('8/8/8/8/8/2k5/P7/1K1R4 w - - 0 1')[0], key('8/8/8/8/8/5k2/7P/4R1K1 w - - 0 1')[0])
+
+    def test_transforms_moves_both_ways(self):
+        board = Chessboard()
+        move = ((0, 0), (0, 7))
+        transform = Transform(True, True)
+
+        self.assertEqual(transform_move(board, move, transform), ((7, 7), (7, 0)))
+        self.assertEqual(transform_move(board, transform_move(board, move, transform), transform), move)
+        self.assertEqual(transform_move(board, move, IDENTITY), move)
+
+    def test_more_than_two_players_are_keyed_as_they_are(self):
+        board, players = Chessboard(), []
+        white, black, red = Player('White', 1, players), Player('Black', -1, players), Player('Red', 1, players)
+        for player, x in [(white, 0), (black, 3), (red, 6)]:
+            King(board, player, x, 3)
+
+        self.assertEqual(canonical_key(white), (position_key(white), IDENTITY))
+
+    def test_players_sharing_a_direction_have_their_own_keys(self):
+        keys = []
+        for white_x, red_x in [(0, 7), (7, 0)]:
+            board, players = Chessboard(), []
+            white, black, red = Player('White', 1, players), Player('Black', -1, players), Player('Red', 1, players)
+            King(board, white, white_x, 0)
+            King(board, black, 0, 7)
+            King(board, red, red_x, 0)
+            self.assertNotEqual(position_key(white), position_key(red))
+            keys.append(position_key(white))
+
+        self.assertNotEqual(*keys)  # The same squares, with White and Red's Kings swapped
+
+
+if __name__ == '__main__':
+    unittest.main()
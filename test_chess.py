@@ -0,0 +1,247 @@
+import unittest
+from chess import Chessboard, Column, Player, Game
+from pieces import King, Rook, Queen, Pawn, Bishop, set_up_pieces
+from search import Search, MATE
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard()
+        Player.players = []
+        self.player1 = Player('White', 1)
+        self.player2 = Player('Black', -1)
+
+    def test_snapshot_copies_pieces(self):
+        set_up_pieces(self.chessboard, self.player1)
+        set_up_pieces(self.chessboard, self.player2)
+
+        board, (white, black) = self.chessboard.snapshot([self.player1, self.player2])
+
+        self.assertEqual(len(white.pieces), 16)
+        self.assertEqual(white.opponents, [black])
+        for x in range(8):
+            for y in range(8):
+                original, copied = self.chessboard.get(x, y), board.get(x, y)
+                self.assertEqual(repr(original), repr(copied))
+                if original:
+                    self.assertIsNot(original, copied)
+                    self.assertIs(copied.board, board)
+                    self.assertIn(copied, copied.player.pieces)
+        self.assertIs(white.king, board.get(4, 0))
+        self.assertEqual(white.castling_rights, {board.get(0, 0), board.get(7, 0)})
+
+    def test_moves_on_snapshot_leave_the_game_alone(self):
+        king = King(self.chessboard, self.player1, 4, 0)
+        rook = Rook(self.chessboard, self.player1, 7, 0)
+        queen = Queen(self.chessboard, self.player2, 7, 7)
+        pawn = Pawn(self.chessboard, self.player1, 0, 6)
+
+        board, (white, black) = self.chessboard.snapshot([self.player1, self.player2])
+        board.get(7, 7).move(7, 0)  # Queen takes the rook, checking the king
+        board.get(0, 6).move(0, 7)  # Pawn promotes
+
+        self.assertTrue(white.king.in_check)
+        self.assertEqual(white.castling_rights, set())
+        self.assertEqual(black.score, 5)
+
+        self.assertIs(self.chessboard.get(7, 0), rook)
+        self.assertIs(self.chessboard.get(7, 7), queen)
+        self.assertIs(self.chessboard.get(0, 6), pawn)
+        self.assertCountEqual(self.player1.pieces, [king, rook, pawn])
+        self.assertEqual(self.player1.castling_rights, {rook})
+        self.assertEqual(self.player2.score, 0)
+        self.assertFalse(king.in_check)
+        self.assertIn((6, 0), king.legal_moves)
+
+    def test_snapshot_of_a_taken_king(self):
+        red = Player('Red', 1)
+        King(self.chessboard, self.player1, 4, 0)
+        King(self.chessboard, red, 0, 0)
+        rook = Rook(self.chessboard, self.player2, 0, 7)
+        King(self.chessboard, self.player2, 7, 7)
+        rook.move(0, 0)  # With three players, kings can be taken
+
+        board, (white, black, red) = self.chessboard.snapshot([self.player1, self.player2, red])
+
+        self.assertFalse(red.king)
+        self.assertIs(board.get(0, 0).player, black)
+        self.assertIs(white.king, board.get(4, 0))
+
+
+class LargeBoardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard(16, 12)
+        self.players = []
+        self.white = Player('White', 1, players=self.players)
+        self.black = Player('Black', -1, players=self.players)
+
+    def test_reads_squares_through_columns(self):
+        king = King(self.chessboard, self.white, 8, 0)
+
+        self.assertEqual(len(self.chessboard), 16)
+        self.assertIsInstance(self.chessboard[8], Column)
+        self.assertEqual(len(self.chessboard[8]), 12)
+        self.assertIs(self.chessboard[8][0], king)
+        self.assertEqual(list(self.chessboard[8]), [king] + [None] * 11)
+        self.assertFalse(self.chessboard.get(16, 0))
+        self.assertFalse(self.chessboard.get(0, 12))
+        with self.assertRaises(IndexError):
+            self.chessboard[16]
+
+    def test_sets_up_full_armies(self):
+        set_up_pieces(self.chessboard, self.white)
+        set_up_pieces(self.chessboard, self.black)
+
+        self.assertEqual(len(self.white.pieces), 32)
+        self.assertIs(self.white.king, self.chessboard.get(8, 0))
+        self.assertIs(self.black.king, self.chessboard.get(8, 11))
+        self.assertEqual(self.white.castling_rights, {self.chessboard.get(0, 0), self.chessboard.get(15, 0)})
+        self.assertEqual(len(list(self.white.iter_legal_moves())), 2 * (16 + 6))  # Two for each Pawn and Knight
+
+    def test_promotes_on_the_far_rank(self):
+        King(self.chessboard, self.white, 8, 0)
+        King(self.chessboard, self.black, 8, 11)
+        pawn = Pawn(self.chessboard, self.white, 0, 10)
+        pawn.move(0, 11)
+
+        self.assertEqual(self.chessboard.get(0, 11).name, 'Queen')
+
+    def test_snapshot_copies_only_the_pieces(self):
+        set_up_pieces(self.chessboard, self.white)
+        King(self.chessboard, self.black, 8, 11)
+
+        board, (white, black) = self.chessboard.snapshot(self.players)
+
+        self.assertEqual((board.width, board.height), (16, 12))
+        self.assertEqual(len(board._pieces), 33)
+        self.assertIs(black.king, board.get(8, 11))
+        self.assertIsNot(board.get(0, 0), self.chessboard.get(0, 0))
+
+
+class ThreatsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard()
+        Player.players = []
+        self.player1 = Player('White', 1)
+        self.player2 = Player('Black', -1)
+        self.player3 = Player('Red', 1)
+
+    def test_combines_threats_of_all_opponents(self):
+        king = King(self.chessboard, self.player1, 4, 0)
+        rook = Rook(self.chessboard, self.player2, 0, 2)
+        bishop = Bishop(self.chessboard, self.player3, 7, 3)
+        King(self.chessboard, self.player2, 0, 7)
+        King(self.chessboard, self.player3, 7, 7)
+
+        self.assertEqual(self.player1.threats[(4, 0)], [bishop])
+        self.assertCountEqual(self.player1.threats[(6, 2)], [rook, bishop])
+        self.assertEqual(king.threatened_by, [bishop])
+        self.assertTrue(king.in_check)
+        self.assertEqual(king.legal_moves, {(3, 0), (5, 0), (3, 1), (4, 1)})
+
+    def test_threats_are_kept_until_the_board_changes(self):
+        King(self.chessboard, self.player1, 4, 0)
+        rook = Rook(self.chessboard, self.player2, 0, 3)
+
+        threats = self.player1.threats
+        self.assertIs(self.player1.threats, threats)
+
+        rook.move(4, 3)
+        self.assertIsNot(self.player1.threats, threats)
+        self.assertTrue(self.player1.king.in_check)
+
+
+class GameTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard()
+        self.players = []
+        self.white = Player('White', 1, players=self.players)
+        self.black = Player('Black', -1, players=self.players)
+
+    def test_takes_turns(self):
+        set_up_pieces(self.chessboard, self.white)
+        set_up_pieces(self.chessboard, self.black)
+        game = Game(self.chessboard, self.players)
+
+        self.assertFalse(game.move((4, 6), (4, 4)))  # Not Black's turn
+        self.assertTrue(game.move((4, 1), (4, 3)))
+        self.assertIs(game.current_player, self.black)
+        self.assertTrue(game.move((4, 6), (4, 4)))
+        self.assertIs(game.current_player, self.white)
+        self.assertEqual(game.moves, 2)
+
+    def test_check_mate(self):
+        King(self.chessboard, self.white, 6, 5)
+        Queen(self.chessboard, self.white, 0, 6)
+        King(self.chessboard, self.black, 7, 7)
+
+        game = Game(self.chessboard, self.players)
+        game.move((0, 6), (6, 6))
+        self.assertEqual(game.result, 'Check mate, White wins.')
+        self.assertEqual(game.knocked_out, [])
+        self.assertEqual(self.chessboard.get(7, 7).name, 'King')  # The final position is left on the board
+        self.assertEqual(self.players, [self.white, self.black])
+
+    def test_uses_a_copy_of_the_shared_players(self):
+        Player.players = []
+        white, black = Player('White', 1), Player('Black', -1)
+        King(self.chessboard, white, 6, 5)
+        Queen(self.chessboard, white, 0, 6)
+        King(self.chessboard, black, 7, 7)
+
+        game = Game(self.chessboard)
+        game.move((0, 6), (6, 6))
+        self.assertEqual(game.result, 'Check mate, White wins.')
+        self.assertEqual(Player.players, [white, black])
+
+    def test_shared_players_game_continues_after_a_knock_out(self):
+        Player.players = []
+        white, black, red = Player('White', 1), Player('Black', -1), Player('Red', 1)
+        King(self.chessboard, white, 6, 5)
+        Queen(self.chessboard, white, 0, 6)
+        Rook(self.chessboard, white, 5, 1)
+        Rook(self.chessboard, white, 3, 4)
+        King(self.chessboard, black, 2, 0)
+        King(self.chessboard, red, 7, 7)
+        game = Game(self.chessboard)
+
+        game.move((0, 6), (6, 6))  # Check mates Red
+        game.move((2, 0), (1, 0))
+        self.assertEqual(game.knocked_out, [red])
+        self.assertEqual(white.opponents, [black])
+        self.assertEqual(Search().search(white, 2)[0], MATE - 1)
+
+        game.move((3, 4), (3, 0))
+        self.assertEqual(game.result, 'Check mate, White wins.')
+        self.assertEqual(Player.players, [white, black, red])
+
+    def test_stalemate(self):
+        King(self.chessboard, self.white, 6, 5)
+        Queen(self.chessboard, self.white, 0, 6)
+        King(self.chessboard, self.black, 7, 7)
+
+        game = Game(self.chessboard, self.players)
+        game.move((0, 6), (5, 6))
+        self.assertEqual(game.result, 'Stalemate. Game draw!')
+
+    def test_knocks_out_players_until_one_is_left(self):
+        red = Player('Red', 1, players=self.players)
+        King(self.chessboard, self.white, 6, 5)
+        Queen(self.chessboard, self.white, 0, 6)
+        King(self.chessboard, self.black, 2, 0)
+        King(self.chessboard, red, 7, 7)
+        game = Game(self.chessboard, self.players)
+
+        game.move((0, 6), (6, 6))  # Check mates Red, who moves after Black
+        self.assertEqual(game.knocked_out, [])
+        game.move((2, 0), (1, 0))
+
+        self.assertEqual(game.knocked_out, [red])
+        self.assertIsNone(self.chessboard.get(7, 7))
+        self.assertIs(game.current_player, self.white)
+        self.assertIsNone(game.result)
+        self.assertEqual(self.white.opponents, [self.black])
+
+
+if __name__ == '__main__':
+    unittest.main()
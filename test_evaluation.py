@@ -0,0 +1,72 @@
+import threading
+import unittest
+import fen
+from evaluation import EvaluationService, MaterialModel, encode
+from search import Search, evaluate
+
+POSITIONS = [
+    fen.START,
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+    '4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1',
+    '4k3/8/8/3q4/8/8/8/3RK3 b - - 0 1',
+]
+
+
+class BrokenModel:
+    def __call__(self, positions):
+        raise ValueError('broken')
+
+
+class EvaluationTestCase(unittest.TestCase):
+    def test_encodes_from_player_to_move(self):
+        board, white, black, player = fen.load('4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1')
+
+        self.assertEqual(encode(white)[3 * 8 + 0], 4)
+        self.assertEqual(encode(black)[3 * 8 + 0], -4)
+        self.assertEqual(encode(white)[3 * 8 + 4], -5)
+        self.assertEqual(sum(1 for code in encode(white) if code), 4)
+
+    def test_material_model_matches_evaluate(self):
+        model = MaterialModel()
+        players = [fen.load(position)[3] for position in POSITIONS]
+
+        self.assertEqual(model([encode(player) for player in players]), [evaluate(player) for player in players])
+
+    def test_evaluates_in_batches(self):
+        model = MaterialModel()
+        board, white, black, player = fen.load(POSITIONS[2])
+        with EvaluationService(model, max_batch_size=4, max_wait=0.05) as service:
+            futures = [service.submit(encode(white)) for n in range(10)]
+            self.assertEqual([future.result() for future in futures], [-400] * 10)
+
+        self.assertEqual(service.positions, 10)
+        self.assertEqual(model.calls, service.batches)
+        self.assertLess(service.batches, 10)
+
+    def test_passes_on_model_errors(self):
+        board, white, black, player = fen.load(POSITIONS[2])
+        with EvaluationService(BrokenModel()) as service:
+            with self.assertRaises(ValueError):
+                service.submit(encode(white)).result()
+
+    def test_batches_concurrent_searches(self):
+        positions = [POSITIONS[0], POSITIONS[2], POSITIONS[3], '4k3/3p4/8/7P/8/P7/P7/4K3 w - - 0 1']  # The last has uneven pawns
+        expected = [Search().search(fen.load(position)[3], 2) for position in positions]
+
+        results = [None] * len(positions)
+        with EvaluationService(MaterialModel(), max_batch_size=len(positions), max_wait=0.002) as service:
+            def search(index):
+                results[index] = Search(evaluator=service).search(fen.load(positions[index])[3], 2)
+
+            threads = [threading.Thread(target=search, args=(index,)) for index in range(len(positions))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results, expected)
+        self.assertGreater(service.stats['mean_batch_size'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from chess import Chessboard, Player
+from pieces import Pawn, Knight, Rook, Queen, King
+from exchange import static_exchange
+
+
+class StaticExchangeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard()
+        Player.players = []
+        self.player1 = Player('White', 1)
+        self.player2 = Player('Black', -1)
+
+    def test_undefended_capture_wins_the_piece(self):
+        Queen(self.chessboard, self.player1, 3, 3)
+        Knight(self.chessboard, self.player2, 3, 6)
+
+        self.assertEqual(static_exchange(self.chessboard, ((3, 3), (3, 6))), 3)
+
+    def test_capturing_a_defended_piece(self):
+        Pawn(self.chessboard, self.player1, 2, 4)
+        Queen(self.chessboard, self.player1, 3, 2)
+        Knight(self.chessboard, self.player2, 3, 5)
+        Pawn(self.chessboard, self.player2, 4, 6)  # Defends the knight
+
+        self.assertEqual(static_exchange(self.chessboard, ((2, 4), (3, 5))), 3)  # Pawn takes knight, pawns are traded
+        self.assertEqual(static_exchange(self.chessboard, ((3, 2), (3, 5))), -5)  # Queen takes knight, and is lost for a pawn
+
+    def test_pieces_behind_attackers_join_in(self):
+        rook = Rook(self.chessboard, self.player1, 3, 0)
+        Rook(self.chessboard, self.player1, 3, 1)
+        Rook(self.chessboard, self.player2, 3, 6)
+        Rook(self.chessboard, self.player2, 3, 7)
+
+        self.assertEqual(static_exchange(self.chessboard, ((3, 1), (3, 6))), 5)
+
+        rook.kill()
+        self.chessboard.blank(3, 0)
+
+        self.assertEqual(static_exchange(self.chessboard, ((3, 1), (3, 6))), 0)
+
+    def test_king_cant_take_defended_pieces(self):
+        King(self.chessboard, self.player1, 4, 4)
+        Pawn(self.chessboard, self.player2, 4, 5)
+        Rook(self.chessboard, self.player2, 4, 7)
+
+        self.assertLess(static_exchange(self.chessboard, ((4, 4), (4, 5))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
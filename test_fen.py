@@ -0,0 +1,46 @@
+import unittest
+import fen
+from pieces import King, Rook
+
+
+class FenTestCase(unittest.TestCase):
+    def test_starting_position(self):
+        board, white, black, player = fen.load(fen.START)
+
+        self.assertIs(player, white)
+        self.assertEqual(white.players, [white, black])
+        self.assertEqual(len(white.pieces), 16)
+        self.assertIsInstance(board.get(4, 7), King)
+        self.assertIs(board.get(4, 7).player, black)
+        self.assertEqual(white.castling_rights, {board.get(0, 0), board.get(7, 0)})
+        self.assertEqual(len(list(white.iter_legal_moves())), 20)
+
+    def test_castling_rights_and_moved_pawns(self):
+        board, white, black, player = fen.load('r3k2r/8/8/8/8/2P5/8/R3K2R b Kq - 0 1')
+
+        self.assertIs(player, black)
+        self.assertEqual(white.castling_rights, {board.get(7, 0)})
+        self.assertEqual(black.castling_rights, {board.get(0, 7)})
+        self.assertTrue(board.get(2, 2).has_moved)
+        self.assertIsInstance(board.get(0, 0), Rook)
+        self.assertNotIn((2, 0), white.king.legal_moves)
+        self.assertIn((6, 0), white.king.legal_moves)
+
+    def test_round_trip(self):
+        for position in [fen.START, 'r3k2r/8/8/8/8/2P5/8/R3K2R b Kq - 0 1', '8/8/8/8/8/8/8/K6k w - - 0 1']:
+            board, white, black, player = fen.load(position)
+            self.assertEqual(fen.dump(board, player), position)
+
+    def test_larger_boards(self):
+        position = 'r4k3r/pppppppppp/10/10/10/10/10/PPPPPPPPPP/R4K3R w KQkq - 0 1'
+        board, white, black, player = fen.load(position)
+
+        self.assertEqual((board.width, board.height), (10, 9))
+        self.assertIsInstance(board.get(5, 8), King)
+        self.assertEqual(white.castling_rights, {board.get(0, 0), board.get(9, 0)})
+        self.assertFalse(any(piece.has_moved for piece in white.pieces + black.pieces))
+        self.assertEqual(fen.dump(board, player), position)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from types import SimpleNamespace
+import chess
+import fuzz
+import pieces
+
+
+def no_castles(player):
+    '''
+    A broken fast path that forgets to castle.
+    '''
+    return {move for move in fuzz.legal_moves(player)
+            if not (move[0] == player.king.position and abs(move[1][0] - move[0][0]) == 2)}
+
+
+class EndlessGame(chess.Game):
+    '''
+    A broken Game that never ends.
+    '''
+
+    def update_result(self):
+        pass
+
+
+class FuzzTestCase(unittest.TestCase):
+    def test_pieces_match_reference(self):
+        for seed in range(3):
+            self.assertIsNone(fuzz.random_game(fuzz.load('pieces'), seed, 120))
+
+    def test_finds_and_shrinks_differences(self):
+        broken = SimpleNamespace(Chessboard=chess.Chessboard, Player=chess.Player,
+                                 set_up_pieces=pieces.set_up_pieces, legal_moves=no_castles)
+
+        seed = next(seed for seed in range(100) if fuzz.random_game(broken, seed, 300))
+        moves = fuzz.random_game(broken, seed, 300)
+        shrunk = fuzz.shrink(broken, moves)
+
+        self.assertLessEqual(len(shrunk), len(moves))
+        self.assertIn('missing moves', fuzz.replay(broken, shrunk))
+        for index in range(len(shrunk)):  # No single move can be dropped
+            self.assertIsNone(fuzz.replay(broken, shrunk[:index] + shrunk[index + 1:]))
+
+    def test_compares_game_results(self):
+        broken = SimpleNamespace(Chessboard=chess.Chessboard, Player=chess.Player,
+                                 set_up_pieces=pieces.set_up_pieces, Game=EndlessGame)
+
+        seed = next(seed for seed in range(100) if fuzz.random_game(broken, seed, 300))
+        self.assertIn('outcome', fuzz.replay(broken, fuzz.random_game(broken, seed, 300)))
+
+
+if __name__ == '__main__':
+    unittest.main()
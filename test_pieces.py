@@ -245,6 +245,45 @@ class KingTestCase(PieceTestCase):
         self.assertEqual(king.position, (2, 0))
         self.assertEqual(rook.position, (3, 0))
 
+    def test_cant_castle_after_rook_is_taken(self):
+        king = self.create_king(4, 0)
+
+        rook = Rook(self.chessboard, self.player1, 7, 0)
+        self.assertIn(rook, self.player1.castling_rights)
+
+        Knight(self.chessboard, self.player2, 6, 2).move(7, 0)  # Enemy Knight takes the rook
+
+        self.assertNotIn(rook, self.player1.castling_rights)
+        self.assertNotIn((6, 0), king.legal_moves)
+
+    def test_cant_castle_out_of_check(self):
+        king = self.create_king(4, 0)
+
+        Rook(self.chessboard, self.player1, 0, 0)
+        Rook(self.chessboard, self.player2, 4, 7)  # Enemy Rook
+
+        self.assertTrue(king.in_check)
+        self.assertNotIn((2, 0), king.legal_moves)
+
+    def test_cant_castle_through_check(self):
+        king = self.create_king(4, 0)
+
+        Rook(self.chessboard, self.player1, 0, 0)
+        Rook(self.chessboard, self.player2, 3, 7)  # Enemy Rook attacks the square the king passes over
+
+        self.assertFalse(king.in_check)
+        self.assertNotIn((2, 0), king.legal_moves)
+        self.assertFalse(king.move(2, 0))
+
+    def test_cant_castle_in_to_check(self):
+        king = self.create_king(4, 0)
+
+        Rook(self.chessboard, self.player1, 7, 0)
+        Bishop(self.chessboard, self.player2, 4, 2)  # Enemy Bishop attacks the king's castling target
+
+        self.assertFalse(king.in_check)
+        self.assertNotIn((6, 0), king.legal_moves)
+
     def test_in_check(self):
         king = self.create_king(4, 4)
 
@@ -559,5 +598,19 @@ class QueenTestCase(PieceTestCase):
         self.assertEqual(self.player2.score, 9)
 
 
+class PlayerTestCase(PieceTestCase):
+    def test_player_iterates_the_legal_moves_of_every_piece(self):
+        king = King(self.chessboard, self.player1, 5, 0)
+        rook = Rook(self.chessboard, self.player1, 5, 1)
+        pawn = self.create_pawn(6, 1)
+        knight = Knight(self.chessboard, self.player1, 1, 0)
+
+        Rook(self.chessboard, self.player2, 5, 7)  # Enemy Rook
+        Queen(self.chessboard, self.player2, 7, 2)  # Enemy Queen
+
+        self.assertCountEqual(self.player1.iter_legal_moves(),
+                              [(piece, move) for piece in [king, rook, pawn, knight] for move in piece.legal_moves])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import fen
+from random import Random
+from chess import Chessboard, Player
+from pieces import King, Rook, Pawn, set_up_pieces
+from evaluation import EvaluationService, MaterialModel
+from players import MCTSPlayer, RandomPlayer
+
+
+class PlayerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard()
+        Player.players = []
+
+    def test_random_player_plays_a_legal_move(self):
+        white = RandomPlayer('White', 1)
+        set_up_pieces(self.chessboard, white)
+
+        start, target = white.play_turn().split(' to ')
+        piece = self.chessboard.get('abcdefgh'.index(start[0]), int(start[1]) - 1)
+
+        self.assertIn(('abcdefgh'.index(target[0]), int(target[1]) - 1), piece.legal_moves)
+
+
+class MCTSPlayerTestCase(PlayerTestCase):
+    def test_finds_check_mate(self):
+        white = MCTSPlayer('White', 1, time_limit=0.5, seed=1)
+        black = Player('Black', -1)
+        King(self.chessboard, white, 4, 0)
+        Rook(self.chessboard, white, 0, 0)
+        King(self.chessboard, black, 7, 7)
+        for x in [5, 6, 7]:
+            Pawn(self.chessboard, black, x, 6)
+
+        self.assertEqual(white.play_turn(), 'a1 to a8')
+        self.assertGreater(white.playouts_per_second, 0)
+
+    def test_finds_check_mate_with_evaluator(self):
+        with EvaluationService(MaterialModel(), max_batch_size=8) as evaluator:
+            white = MCTSPlayer('White', 1, time_limit=0.5, seed=1, evaluator=evaluator)
+            black = Player('Black', -1)
+            King(self.chessboard, white, 4, 0)
+            Rook(self.chessboard, white, 0, 0)
+            King(self.chessboard, black, 7, 7)
+            for x in [5, 6, 7]:
+                Pawn(self.chessboard, black, x, 6)
+
+            self.assertEqual(white.play_turn(), 'a1 to a8')
+            self.assertGreater(evaluator.stats['mean_batch_size'], 1)
+
+    def test_loads_from_fen(self):
+        board, white, black, player = fen.load('6k1/5ppp/8/8/8/8/8/R3K3 w - - 0 1', (MCTSPlayer, Player))
+
+        self.assertIsInstance(white, MCTSPlayer)
+        self.assertEqual(white.players, [white, black])
+        self.assertEqual(Player.players, [])
+        white.time_limit, white.random = 0.5, Random(1)
+        self.assertEqual(white.play_turn(), 'a1 to a8')
+
+    def test_reuses_tree_after_opponent_moves(self):
+        white = MCTSPlayer('White', 1, time_limit=0.3, playout_depth=2, seed=1)
+        black = Player('Black', -1)
+        set_up_pieces(self.chessboard, white)
+        set_up_pieces(self.chessboard, black)
+
+        white.play_turn()
+        reply = next(iter(white._tree.children.values()))
+        white.apply(self.chessboard, white._tree.move)
+        white.apply(self.chessboard, reply.move)
+
+        self.assertIs(white.reuse_tree(self.chessboard, [white, black]), reply)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import fen
+from search import Search, MATE, FEATURES
+from transposition import TranspositionTable
+
+KIWIPETE = 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+
+
+class SearchTestCase(unittest.TestCase):
+    def search(self, position, depth, table=None, **options):
+        board, white, black, player = fen.load(position)
+        search = Search(table, **options)
+        return search.search(player, depth), search
+
+    def test_finds_check_mate(self):
+        (score, move), search = self.search('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1', 2)
+
+        self.assertEqual(score, MATE - 1)
+        self.assertEqual(move, ((0, 0), (0, 7)))
+
+    def test_takes_undefended_queen(self):
+        (score, move), search = self.search('4k3/8/8/3q4/8/8/8/3RK3 w - - 0 1', 2)
+
+        self.assertEqual(move, ((3, 0), (3, 4)))
+        self.assertEqual(score, 500)
+
+    def test_quiescence_sees_recaptures(self):
+        position = '5n1k/3p4/8/8/3Q4/8/8/K7 w - - 0 1'  # The pawn is defended by the knight
+
+        (score, move), search = self.search(position, 1, quiescence=False)
+        self.assertEqual(move, ((3, 3), (3, 6)))
+
+        (score, move), search = self.search(position, 1)
+        self.assertNotEqual(move, ((3, 3), (3, 6)))
+        self.assertEqual(score, 505)  # Black's pawn is isolated, but passed
+
+    def test_move_ordering_doesnt_change_the_score(self):
+        plain = {feature: False for feature in FEATURES}
+        (score, move), plain_search = self.search(KIWIPETE, 2, **plain)
+
+        for feature in ['mvv_lva', 'killers', 'history']:
+            (ordered_score, ordered_move), ordered_search = self.search(KIWIPETE, 2, **dict(plain, **{feature: True}))
+            self.assertEqual(ordered_score, score)
+
+        (ordered_score, ordered_move), ordered_search = self.search(KIWIPETE, 2, **dict(plain, mvv_lva=True))
+        self.assertLess(ordered_search.nodes, plain_search.nodes)
+
+    def test_transposition_table_saves_searching_again(self):
+        table = TranspositionTable(1)
+        first, first_search = self.search(KIWIPETE, 2, table)
+        second, second_search = self.search(KIWIPETE, 2, table)
+
+        self.assertEqual(first, second)
+        self.assertLess(second_search.nodes, first_search.nodes)
+        self.assertGreater(table.stats['hit_rate'], 0)
+
+    def test_stops_deepening_at_time_limit(self):
+        board, white, black, player = fen.load(KIWIPETE)
+        search = Search()
+        score, move = search.search(player, 20, time_limit=0.2)
+
+        self.assertGreaterEqual(search.depth, 1)
+        self.assertLess(search.depth, 20)
+        self.assertIsNotNone(move)
+
+
+if __name__ == '__main__':
+    unittest.main()
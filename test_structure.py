@@ -0,0 +1,92 @@
+import unittest
+from random import Random
+import fen
+from chess import Chessboard, Game, Player
+from pieces import Pawn, King, set_up_pieces
+from structure import PawnTable, structure_scores, DOUBLED_PAWN, ISOLATED_PAWN, PASSED_PAWN
+from zobrist import zobrist
+
+
+def pawn_key(board):
+    key = 0
+    for x in range(len(board)):
+        for y in range(len(board[0])):
+            piece = board.get(x, y)
+            if piece and piece.name == 'Pawn':
+                key ^= zobrist('Pawn', piece.player.players.index(piece.player), x, y)
+    return key
+
+
+class PawnKeyTestCase(unittest.TestCase):
+    def test_pawn_key_follows_moves_captures_and_promotions(self):
+        for seed in range(3):
+            random = Random(seed)
+            board, players = Chessboard(), []
+            for name, direction in [('White', 1), ('Black', -1)]:
+                set_up_pieces(board, Player(name, direction, players=players))
+
+            for ply in range(300):
+                moves = list(players[ply % 2].iter_legal_moves())
+                if not moves or all(len(player.pieces) == 1 for player in players):
+                    break
+                piece, target = random.choice(moves)
+                piece.move(*target)
+                self.assertEqual(board.pawn_key, pawn_key(board))
+
+    def test_promotion_removes_the_pawn(self):
+        board, white, black, player = fen.load('7k/P7/8/8/8/8/8/K7 w - - 0 1')
+        board.get(0, 6).move(0, 7)
+
+        self.assertEqual(board.pawn_key, 0)
+
+    def test_snapshots_keep_the_pawn_key(self):
+        board, white, black, player = fen.load(fen.START)
+        snapshot, players = board.snapshot(player.players)
+        snapshot.get(4, 1).move(4, 3)
+
+        self.assertEqual(board.pawn_key, pawn_key(board))
+        self.assertEqual(snapshot.pawn_key, pawn_key(snapshot))
+        self.assertNotEqual(board.pawn_key, snapshot.pawn_key)
+
+
+class StructureTestCase(unittest.TestCase):
+    def test_scores_doubled_isolated_and_passed_pawns(self):
+        # White has doubled, isolated pawns on the a file, and a passed pawn on the h file on
+        # its fifth rank. Black's d pawn is isolated and passed.
+        board, white, black, player = fen.load('4k3/3p4/8/7P/8/P7/P7/4K3 w - - 0 1')
+        scores = structure_scores(board, player.players)
+
+        self.assertEqual(scores[0], -DOUBLED_PAWN - 3 * ISOLATED_PAWN + PASSED_PAWN * ((1 + 0) + (1 + 1) + (1 + 3)))
+        self.assertEqual(scores[1], -ISOLATED_PAWN + PASSED_PAWN)
+
+    def test_players_sharing_a_direction_are_scored_apart(self):
+        board, players = Chessboard(), []
+        white, black, red = Player('White', 1, players), Player('Black', -1, players), Player('Red', 1, players)
+        for player, x in [(white, 0), (black, 4), (red, 7)]:
+            King(board, player, x, 7 if player is black else 0)
+        Pawn(board, white, 0, 1)
+        Pawn(board, red, 0, 2)
+        key = board.pawn_key
+
+        self.assertEqual(structure_scores(board, players), {0: -ISOLATED_PAWN, 1: 0, 2: -ISOLATED_PAWN + PASSED_PAWN * 2})
+        self.assertEqual(key, pawn_key(board))
+        self.assertNotEqual(key, zobrist('Pawn', 0, 0, 1) ^ zobrist('Pawn', 0, 0, 2))
+
+        Game(board, players).knock_out(white)  # Red's Pawn now keys as the second player's
+        self.assertEqual(board.pawn_key, pawn_key(board))
+
+    def test_table_keeps_scores(self):
+        board, white, black, player = fen.load('4k3/3p4/8/7P/8/P7/P7/4K3 w - - 0 1')
+        table = PawnTable(16)
+        score = table.score(white)
+
+        self.assertEqual(table.score(black), -score)
+        self.assertEqual(table.stats['hit_rate'], 0.5)
+
+        board.get(7, 4).move(7, 5)
+        self.assertNotEqual(table.score(white), score)
+        self.assertEqual(table.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import socket
+import tempfile
+import unittest
+import fen
+from search import Search
+from telemetry import Telemetry
+from transposition import TranspositionTable
+
+
+class TelemetryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'events.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def events(self):
+        with open(self.path) as events:
+            return [json.loads(line) for line in events]
+
+    def test_reports_each_iteration(self):
+        telemetry = Telemetry(self.path)
+        board, white, black, player = fen.load('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+        Search(TranspositionTable(1), telemetry).search(player, 3)
+        telemetry.close()
+
+        events = self.events()
+        self.assertEqual([event['depth'] for event in events], [1, 2, 3])
+        self.assertIsNone(events[0]['ebf'])
+        self.assertGreater(events[2]['ebf'], 0)
+        self.assertEqual(events[2]['pv'][0], 'a1a8')
+        self.assertIn('table_hit_rate', events[2])
+
+    def test_streams_to_unix_socket(self):
+        address = os.path.join(self.directory.name, 'events.sock')
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(address)
+        server.listen(1)
+
+        telemetry = Telemetry('unix:' + address)
+        telemetry.emit('iteration', depth=1)
+        connection, _ = server.accept()
+        telemetry.close()
+        received = connection.makefile().read()
+        connection.close()
+        server.close()
+
+        self.assertEqual(json.loads(received)['depth'], 1)
+
+    def test_turns_off_when_stream_fails(self):
+        telemetry = Telemetry('unix:' + os.path.join(self.directory.name, 'missing.sock'))
+        telemetry.emit('iteration', depth=1)
+
+        self.assertFalse(telemetry.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from chess import Chessboard, Player
+from pieces import King, Rook, Pawn
+from transposition import TranspositionTable, Entry, EXACT, LOWER, UPPER
+from zobrist import position_key
+
+
+class TranspositionTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(size_mb=1)
+
+    def test_stores_and_probes_entries(self):
+        self.table.store(12345, 4, LOWER, -250, ((4, 1), (4, 3)))
+        self.table.store(67890, 0, UPPER, 3)
+
+        self.assertEqual(self.table.probe(12345), Entry(4, LOWER, -250, ((4, 1), (4, 3))))
+        self.assertEqual(self.table.probe(67890), Entry(0, UPPER, 3, None))
+        self.assertIsNone(self.table.probe(11111))
+        self.assertEqual(self.table.stats['hits'], 2)
+        self.assertEqual(self.table.stats['probes'], 3)
+
+    def test_size_is_fixed(self):
+        self.assertEqual(len(self.table), 2 ** 20 // 16)
+
+        for key in range(1, 3 * len(self.table)):
+            self.table.store(key, key % 7, EXACT, key)
+
+        self.assertEqual(len(self.table), 2 ** 20 // 16)
+        self.assertEqual(self.table.stats['fill'], 1.0)
+        self.assertGreater(self.table.stats['overwrites'], 0)
+
+    def test_deepest_entry_is_kept_and_others_replace(self):
+        buckets = self.table.buckets
+        deep, shallow, other = 7, 7 + buckets, 7 + buckets * 2  # All in the same bucket
+
+        self.table.store(deep, 6, EXACT, 1)
+        self.table.store(shallow, 2, EXACT, 2)
+        self.table.store(other, 3, EXACT, 3)  # Replaces the shallow entry, not the deep one
+
+        self.assertEqual(self.table.probe(deep).score, 1)
+        self.assertIsNone(self.table.probe(shallow))
+        self.assertEqual(self.table.probe(other).score, 3)
+        self.assertEqual(self.table.stats['collisions'], 1)
+        self.assertEqual(self.table.stats['overwrites'], 1)
+
+        self.table.store(shallow, 8, EXACT, 4)  # Deeper, so takes the depth-preferred slot
+
+        self.assertEqual(self.table.probe(shallow).score, 4)
+        self.assertEqual(self.table.probe(deep).score, 1)
+        self.assertIsNone(self.table.probe(other))
+
+
+class PositionKeyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.chessboard = Chessboard()
+        Player.players = []
+        self.player1 = Player('White', 1)
+        self.player2 = Player('Black', -1)
+
+    def test_keys_depend_on_position_and_player_to_move(self):
+        King(self.chessboard, self.player1, 4, 0)
+        Rook(self.chessboard, self.player1, 7, 0)
+        pawn = Pawn(self.chessboard, self.player2, 3, 6)
+        key = position_key(self.player1)
+
+        self.assertNotEqual(key, position_key(self.player2))
+        board, (white, black) = self.chessboard.snapshot([self.player1, self.player2])
+        self.assertEqual(key, position_key(white))
+
+        pawn.move(3, 5)
+        self.assertNotEqual(key, position_key(self.player1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+'''
+A fixed size transposition table for searches, stored in packed arrays.
+
+Each bucket holds two entries, a depth-preferred slot that keeps the deepest search
+of any position hashed to it, and an always-replace slot for everything else. An
+entry is a 64 bit key and 64 bits of data packing, from the lowest bit: a used flag,
+the bound type (2 bits), depth (8 bits), best move (25 bits) and score (28 bits).
+'''
+from array import array
+from collections import namedtuple
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+ENTRY_BYTES = 16
+SCORE_OFFSET = 1 << 27
+
+Entry = namedtuple('Entry', ['depth', 'bound', 'score', 'move'])
+
+
+def pack_move(move):
+    if move is None:
+        return 0
+    (from_x, from_y), (to_x, to_y) = move
+    return 1 | from_x << 1 | from_y << 7 | to_x << 13 | to_y << 19
+
+
+def unpack_move(packed):
+    if not packed & 1:
+        return None
+    return ((packed >> 1 & 63, packed >> 7 & 63), (packed >> 13 & 63, packed >> 19 & 63))
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16):
+        self.buckets = max(int(size_mb * 2 ** 20) // (ENTRY_BYTES * 2), 1)
+        self.keys = array('Q', bytes(8 * self.buckets * 2))
+        self.data = array('Q', bytes(8 * self.buckets * 2))
+        self.used = 0
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def reset_stats(self):
+        self.probes = self.hits = self.collisions = 0
+        self.stores = self.overwrites = 0
+
+    def clear(self):
+        self.keys = array('Q', bytes(8 * len(self.keys)))
+        self.data = array('Q', bytes(8 * len(self.data)))
+        self.used = 0
+        self.reset_stats()
+
+    def probe(self, key):
+        '''
+        Returns the Entry stored for key, or None.
+        '''
+        self.probes += 1
+        slot = key % self.buckets * 2
+        entry = self.peek(key)
+        if entry:
+            self.hits += 1
+        elif self.data[slot] & 1 or self.data[slot + 1] & 1:  # Another position shares the bucket
+            self.collisions += 1
+        return entry
+
+    def peek(self, key):
+        '''
+        Returns the Entry stored for key, or None, without counting towards the stats.
+        '''
+        slot = key % self.buckets * 2
+        for index in [slot, slot + 1]:
+            if self.keys[index] == key and self.data[index] & 1:
+                data = self.data[index]
+                return Entry(data >> 3 & 255, data >> 1 & 3, (data >> 36) - SCORE_OFFSET, unpack_move(data >> 11))
+        return None
+
+    def store(self, key, depth, bound, score, move=None):
+        self.stores += 1
+        slot = key % self.buckets * 2
+        score = max(min(score, SCORE_OFFSET - 1), -SCORE_OFFSET)
+        depth = max(min(depth, 255), 0)
+        data = 1 | bound << 1 | depth << 3 | pack_move(move) << 11 | (score + SCORE_OFFSET) << 36
+
+        if self.keys[slot + 1] == key and self.data[slot + 1] & 1:  # Don't leave a stale copy behind
+            self.data[slot + 1] = 0
+            self.used -= 1
+
+        if not self.data[slot] & 1 or self.keys[slot] == key:
+            index = slot
+        elif depth >= self.data[slot] >> 3 & 255:
+            self._write(slot + 1, self.keys[slot], self.data[slot])  # Demote the shallower entry
+            self.data[slot] = 0
+            self.used -= 1
+            index = slot
+        else:
+            index = slot + 1
+
+        self._write(index, key, data)
+
+    def _write(self, index, key, data):
+        if not self.data[index] & 1:
+            self.used += 1
+        elif self.keys[index] != key:
+            self.overwrites += 1
+        self.keys[index] = key
+        self.data[index] = data
+
+    @property
+    def stats(self):
+        return {
+            'size_mb': len(self) * ENTRY_BYTES / 2 ** 20,
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'collisions': self.collisions,
+            'collision_rate': self.collisions / self.probes if self.probes else 0.0,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'overwrite_rate': self.overwrites / self.stores if self.stores else 0.0,
+            'fill': self.used / len(self),
+        }
@@ -0,0 +1,43 @@
+'''
+Zobrist keys, 64 bit hashes of positions built by XORing a random number for each
+piece on each square. Keys are derived from a digest of their description so they
+are the same in every process and run, which lets them key on disk stores too.
+
+Pieces and the player to move are told apart by the player's place in the order of
+play, as players may share a direction in games of more than two.
+'''
+from hashlib import blake2b
+
+_keys = {}
+
+
+def zobrist(*description):
+    '''
+    Returns the random 64 bit number for a description, such as ('Pawn', 0, 4, 1).
+    '''
+    try:
+        return _keys[description]
+    except KeyError:
+        key = _keys[description] = int.from_bytes(blake2b(repr(description).encode(), digest_size=8).digest(), 'little')
+        return key
+
+
+def piece_key(piece):
+    '''
+    The key for a piece on its square, including whether it may still make a first move.
+    '''
+    key = zobrist(piece.name, piece.player.players.index(piece.player), piece.x, piece.y)
+    if piece in piece.player.castling_rights or (piece.name in ['Pawn', 'King'] and not piece.has_moved):
+        key ^= zobrist('unmoved', piece.x, piece.y)
+    return key
+
+
+def position_key(player):
+    '''
+    The key for the position of player's game with player to move.
+    '''
+    key = zobrist('turn', player.players.index(player))
+    for each_player in player.players:
+        for piece in each_player.pieces:
+            key ^= piece_key(piece)
+    return key